@@ -0,0 +1,51 @@
+from django.contrib import admin
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from .models import SlowQuery
+
+
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = (
+        'sql',
+        'view',
+        'calls',
+        'total_time',
+        'average_time',
+        'max_time',
+        'last_seen',
+    )
+    list_display_links = ('sql',)
+    list_filter = ('view',)
+    search_fields = ('sql',)
+    fields = (
+        'sql',
+        'view',
+        'calls',
+        'total_time',
+        'max_time',
+        'example',
+        'plan',
+        'first_seen',
+        'last_seen',
+    )
+    readonly_fields = fields
+    empty_value_display = '-пусто-'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            average_time=F('total_time') / Cast('calls', FloatField()))
+
+    def average_time(self, obj):
+        return round(obj.average_time, 2)
+    average_time.short_description = 'Среднее, мс'
+    average_time.admin_order_field = 'average_time'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(SlowQuery, SlowQueryAdmin)
@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .db import apply_sqlite_pragmas
+        from .warmup import warm_up_templates
+
+        connection_created.connect(
+            apply_sqlite_pragmas, dispatch_uid='core_sqlite_pragmas')
+        warm_up_templates()
@@ -0,0 +1,20 @@
+"""Настройка соединений с базой данных."""
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Выполняет PRAGMA из settings.SQLITE_PRAGMAS на новом соединении.
+
+    Подключается к сигналу connection_created в CoreConfig.ready().
+    Часть прагм (journal_mode) хранится в самом файле базы, остальные
+    действуют только в пределах соединения, поэтому их нужно повторять
+    при каждом подключении.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
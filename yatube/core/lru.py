@@ -0,0 +1,76 @@
+"""Ограниченный LRU-кэш в памяти процесса с временем жизни записей."""
+import threading
+import time
+from collections import OrderedDict
+
+from . import metrics
+
+
+class LRUCache:
+    """Хранит не больше maxsize записей, вытесняя самые давние.
+
+    Попадания и промахи кэша с именем name попадают и в /metrics.
+    Кэш принадлежит процессу: у каждого воркера он свой, поэтому
+    сбросы через сигналы видны только в том процессе, где произошло
+    изменение, а в остальных запись живёт не дольше ttl.
+    """
+
+    def __init__(self, maxsize, name=None):
+        self.maxsize = maxsize
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] < time.monotonic():
+                del self._data[key]
+                item = None
+            if item is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+        if self.name:
+            metrics.inc('yatube_cache_requests_total', cache=self.name,
+                        result='miss' if item is None else 'hit')
+        return default if item is None else item[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_if(self, predicate):
+        """Удаляет записи, для значений которых predicate истинен."""
+        with self._lock:
+            for key in [key for key, (expires, value) in self._data.items()
+                        if predicate(value)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        requests = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / requests if requests else 0.0,
+        }
@@ -0,0 +1,43 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import PRIMARY_DATABASE
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в файлы реплик '
+            'из REPLICA_DATABASES.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--every', type=float,
+            help='повторять копирование каждые N секунд')
+
+    def handle(self, *args, **options):
+        replicas = settings.REPLICA_DATABASES
+        if not replicas:
+            raise CommandError('REPLICA_DATABASES пуст')
+        for alias in (PRIMARY_DATABASE, *replicas):
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f'{alias}: поддерживается только SQLite')
+        while True:
+            self.sync(replicas)
+            if not options['every']:
+                break
+            time.sleep(options['every'])
+
+    def sync(self, replicas):
+        primary = connections[PRIMARY_DATABASE]
+        primary.ensure_connection()
+        for alias in replicas:
+            connections[alias].close()
+            target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(self.style.SUCCESS(f'{alias}: скопирована'))
@@ -0,0 +1,200 @@
+"""Метрики в формате Prometheus, общие для всех воркеров.
+
+Каждый процесс пишет свои значения в отдельный файл metrics_<pid>.db
+в каталоге settings.METRICS_DIR, отображённый в память: увеличение
+счётчика — это запись восьми байт без блокировок между процессами.
+/metrics читает файлы всех процессов и складывает значения, поэтому
+ответ не зависит от того, какой воркер его обслужил. Файлы завершённых
+процессов остаются и продолжают входить в сумму, как и положено
+счётчикам; каталог очищают при деплое.
+
+Формат файла: 8 байт заголовка (занятый размер), затем записи
+[длина ключа: int32][ключ, выровненный до 8 байт][значение: float64].
+"""
+import glob
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+INITIAL_SIZE = 1 << 16
+HEADER_SIZE = 8
+INF = float('inf')
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, INF)
+
+METRICS = {
+    'yatube_request_duration_seconds': (
+        'histogram', 'Время ответа по маршрутам'),
+    'yatube_db_queries_total': ('counter', 'Число SQL-запросов'),
+    'yatube_db_query_seconds_total': ('counter', 'Время SQL-запросов'),
+    'yatube_posts_created_total': ('counter', 'Созданные посты'),
+    'yatube_posts_edited_total': ('counter', 'Изменённые посты'),
+    'yatube_cache_requests_total': (
+        'counter', 'Обращения к кэшам по результату'),
+}
+
+
+def _padding(length):
+    return -(length + 4) % 8
+
+
+def iter_entries(data):
+    """(ключ, значение, позиция значения) из содержимого файла."""
+    used = struct.unpack_from('i', data, 0)[0]
+    position = HEADER_SIZE
+    while position < used:
+        length = struct.unpack_from('i', data, position)[0]
+        position += 4
+        key = bytes(data[position:position + length]).decode()
+        position += length + _padding(length)
+        yield key, struct.unpack_from('d', data, position)[0], position
+        position += 8
+
+
+class MmapStore:
+    """Значения float64 по строковым ключам в файле одного процесса."""
+
+    def __init__(self, path):
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < INITIAL_SIZE:
+            self._file.truncate(INITIAL_SIZE)
+            size = INITIAL_SIZE
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._lock = threading.Lock()
+        self._used = struct.unpack_from('i', self._map, 0)[0]
+        if not self._used:
+            self._used = HEADER_SIZE
+            struct.pack_into('i', self._map, 0, self._used)
+        self._positions = {
+            key: position
+            for key, value, position in iter_entries(self._map)}
+
+    def inc(self, key, amount=1.0):
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._add_key(key)
+            value = struct.unpack_from('d', self._map, position)[0]
+            struct.pack_into('d', self._map, position, value + amount)
+
+    def _add_key(self, key):
+        encoded = key.encode()
+        entry = (struct.pack('i', len(encoded)) + encoded
+                 + b' ' * _padding(len(encoded)) + struct.pack('d', 0.0))
+        end = self._used + len(entry)
+        if end > len(self._map):
+            size = len(self._map)
+            while end > size:
+                size *= 2
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        self._map[self._used:end] = entry
+        self._used = end
+        # Заголовок обновляется последним: читатель не увидит
+        # недописанную запись.
+        struct.pack_into('i', self._map, 0, end)
+        self._positions[key] = end - 8
+        return end - 8
+
+
+_store = None
+_store_pid = None
+_store_lock = threading.Lock()
+
+
+def store():
+    """Файл текущего процесса; после fork открывается новый."""
+    global _store, _store_pid
+    pid = os.getpid()
+    if _store_pid != pid:
+        with _store_lock:
+            if _store_pid != pid:
+                os.makedirs(settings.METRICS_DIR, exist_ok=True)
+                _store = MmapStore(os.path.join(
+                    settings.METRICS_DIR, f'metrics_{pid}.db'))
+                _store_pid = pid
+    return _store
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n')
+
+
+def _labels(labels):
+    return ','.join(
+        f'{name}="{_escape(value)}"' for name, value in sorted(labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    store().inc(f'{name}|{_labels(labels)}', amount)
+
+
+def observe(name, value, buckets=DEFAULT_BUCKETS, **labels):
+    """Добавляет наблюдение в гистограмму name.
+
+    Хранится число наблюдений в каждом интервале, а накопленные
+    значения бакетов считаются при чтении.
+    """
+    labels = _labels(labels)
+    le = next(bucket for bucket in buckets if value <= bucket)
+    metrics = store()
+    metrics.inc(f'{name}_bucket|{labels}|{le}')
+    metrics.inc(f'{name}_sum|{labels}', value)
+    metrics.inc(f'{name}_count|{labels}')
+
+
+def collect():
+    """Суммы значений по файлам всех процессов."""
+    totals = defaultdict(float)
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, 'metrics_*.db')):
+        with open(path, 'rb') as metrics_file:
+            data = metrics_file.read(HEADER_SIZE)
+            if len(data) < HEADER_SIZE:
+                continue
+            used = struct.unpack_from('i', data, 0)[0]
+            data += metrics_file.read(used - HEADER_SIZE)
+        for key, value, position in iter_entries(data):
+            totals[key] += value
+    return totals
+
+
+def _sample(name, labels, value):
+    if labels:
+        return f'{name}{{{labels}}} {value:g}'
+    return f'{name} {value:g}'
+
+
+def render():
+    """Текст для /metrics в формате Prometheus 0.0.4."""
+    samples = defaultdict(list)
+    buckets = defaultdict(dict)
+    for key, value in collect().items():
+        name, labels, *le = key.split('|')
+        if le:
+            buckets[(name, labels)][float(le[0])] = value
+        else:
+            samples[name].append((labels, value))
+    for (name, labels), counts in buckets.items():
+        total = 0
+        for le in sorted(set(counts) | set(DEFAULT_BUCKETS)):
+            total += counts.get(le, 0)
+            le_label = 'le="+Inf"' if le == INF else f'le="{le:g}"'
+            samples[name].append(
+                (f'{labels},{le_label}' if labels else le_label, total))
+    lines = []
+    for metric, (kind, help_text) in METRICS.items():
+        names = [metric]
+        if kind == 'histogram':
+            names = [f'{metric}_bucket', f'{metric}_sum', f'{metric}_count']
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} {kind}')
+        for name in names:
+            lines += [_sample(name, labels, value)
+                      for labels, value in samples[name]]
+    return '\n'.join(lines) + '\n'
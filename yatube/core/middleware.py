@@ -0,0 +1,108 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics, timing
+from .nplusone import detect_n_plus_one
+from .routers import pin_primary, use_replicas
+from .slow_queries import capture_slow_queries
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaPinMiddleware:
+    """Отправляет чтения GET-запросов в реплики (см. core.routers).
+
+    Должен стоять в MIDDLEWARE до AuthenticationMiddleware, чтобы
+    выбор базы действовал и на загрузку пользователя.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = request.method not in SAFE_METHODS
+        pinned = writes or settings.REPLICA_PIN_COOKIE in request.COOKIES
+        with use_replicas(not pinned):
+            response = self.get_response(request)
+        if writes:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.resolver_match.app_name == 'admin':
+            pin_primary()
+
+
+class ServerTimingMiddleware:
+    """Добавляет заголовок Server-Timing и метрики времени по маршрутам.
+
+    Стоит в MIDDLEWARE сразу после SlowQueryMiddleware, чтобы total
+    покрывал весь запрос, но не запись журнала медленных запросов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        timings = timing.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timing.sql_wrapper))
+                response = self.get_response(request)
+        finally:
+            timing.stop()
+        total = (time.perf_counter() - started) * 1000
+        response['Server-Timing'] = timings.header(total)
+        match = request.resolver_match
+        route = match.view_name if match is not None else 'unresolved'
+        metrics.observe(
+            'yatube_request_duration_seconds', total / 1000, route=route)
+        metrics.inc('yatube_db_queries_total', timings.queries, route=route)
+        metrics.inc(
+            'yatube_db_query_seconds_total', timings.sql, route=route)
+        return response
+
+
+class NPlusOneMiddleware:
+    """Проверяет каждый запрос к сайту на N+1 (см. core.nplusone).
+
+    Стоит первым в MIDDLEWARE, чтобы разбор стека при каждом SQL-запросе
+    не попадал в замеры SlowQueryMiddleware и ServerTimingMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with detect_n_plus_one():
+            return self.get_response(request)
+
+
+class SlowQueryMiddleware:
+    """Пишет запросы дольше SLOW_QUERY_MS в журнал core.slow_queries.
+
+    Стоит в MIDDLEWARE до ServerTimingMiddleware: журнал записывается
+    после ответа и не попадает ни в Server-Timing, ни в транзакцию
+    представления.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with capture_slow_queries() as log:
+            request._slow_query_log = log
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        log = getattr(request, '_slow_query_log', None)
+        if log is not None:
+            log.view = request.resolver_match.view_name
@@ -0,0 +1,42 @@
+from django.db import models
+
+
+class SlowQuery(models.Model):
+    """Запросы одной формы, выполнявшиеся дольше SLOW_QUERY_MS."""
+
+    fingerprint = models.CharField(
+        max_length=40,
+        unique=True,
+        editable=False)
+    sql = models.TextField(verbose_name='Запрос')
+    example = models.TextField(verbose_name='Самый долгий вызов')
+    plan = models.TextField(
+        verbose_name='План самого долгого вызова',
+        blank=True)
+    view = models.CharField(
+        verbose_name='Представление',
+        max_length=200,
+        blank=True)
+    calls = models.PositiveIntegerField(
+        verbose_name='Вызовов',
+        default=0)
+    total_time = models.FloatField(
+        verbose_name='Всего, мс',
+        default=0)
+    max_time = models.FloatField(
+        verbose_name='Максимум, мс',
+        default=0)
+    first_seen = models.DateTimeField(
+        verbose_name='Впервые',
+        auto_now_add=True)
+    last_seen = models.DateTimeField(
+        verbose_name='Последний раз',
+        auto_now_add=True)
+
+    class Meta:
+        ordering = ['-total_time']
+        verbose_name = 'медленный запрос'
+        verbose_name_plural = 'медленные запросы'
+
+    def __str__(self):
+        return self.sql[:80]
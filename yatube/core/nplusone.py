@@ -0,0 +1,189 @@
+"""Поиск N+1: повторяющихся запросов из ленивых связей моделей.
+
+Пока действует detect_n_plus_one(), запросы, выполненные при обращении
+к связи модели (post.author, post.group без select_related), считаются
+по форме SQL (см. core.slow_queries.normalize) и месту вызова в
+шаблонах и коде проекта. Когда одна форма из одного места набирает
+NPLUSONE_THRESHOLD запросов, детектор сообщает о ней вместе
+со строкой шаблона и строкой кода, откуда пришло обращение: в режиме
+'raise' бросает NPlusOneError, в режиме 'log' пишет предупреждение в
+лог core.nplusone. Режим задаёт settings.NPLUSONE_DETECTION, None
+выключает проверку.
+
+Запросы к сайту проверяет core.middleware.NPlusOneMiddleware, каждый
+тест — NPlusOneTestRunner (manage.py test) и фикстура в
+tests/conftest.py.
+"""
+import logging
+import os
+import sys
+import threading
+import unittest
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.test.runner import (DiscoverRunner, ParallelTestSuite,
+                                RemoteTestResult, RemoteTestRunner)
+
+from .slow_queries import normalize
+
+logger = logging.getLogger(__name__)
+
+RELATED_DESCRIPTORS = os.path.join(
+    'django', 'db', 'models', 'fields', 'related_descriptors.py')
+
+# Обёртки проекта над движком шаблонов: строкой кода для запроса из
+# шаблона должно стать место отрисовки, а не они.
+SKIPPED_FILES = {
+    os.path.join(os.path.dirname(__file__), 'template_backends.py'),
+}
+
+_local = threading.local()
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def _origin(frame):
+    """Места в шаблонах и коде проекта, откуда пришёл запрос.
+
+    Список строк вида файл:строка, начиная с самого вложенного; для
+    запросов не из дескриптора связи возвращает None.
+    """
+    lazy = False
+    places = []
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.endswith(RELATED_DESCRIPTORS):
+            lazy = True
+        elif (lazy and filename.startswith(settings.BASE_DIR)
+              and 'site-packages' not in filename
+              and filename not in SKIPPED_FILES):
+            places.append(
+                f'{os.path.relpath(filename, settings.BASE_DIR)}:'
+                f'{frame.f_lineno}')
+        if lazy and frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            token = getattr(node, 'token', None)
+            origin = getattr(node, 'origin', None)
+            if token is not None and origin is not None:
+                places.append(f'{origin.template_name}:{token.lineno}')
+        frame = frame.f_back
+    if not lazy:
+        return None
+    return places
+
+
+def _first(places, template):
+    for place in places:
+        if place.split(':')[0].endswith('.html') == template:
+            return place
+    return '-'
+
+
+class NPlusOneDetector:
+    """Обёртка connection.execute_wrapper, считающая ленивые запросы."""
+
+    def __init__(self, mode, threshold):
+        self.mode = mode
+        self.threshold = threshold
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if current() is self:
+            self.check(sql)
+        return execute(sql, params, many, context)
+
+    def check(self, sql):
+        places = _origin(sys._getframe(2))
+        if places is None:
+            return
+        # Одинаковые запросы из одного и того же места — это цикл;
+        # повторные обращения из разных строк кода N+1 не считаются.
+        shape = normalize(sql)
+        key = (shape, tuple(places))
+        self.counts[key] += 1
+        if self.counts[key] != self.threshold:
+            return
+        message = (f'N+1: {self.threshold} одинаковых запроса из ленивой '
+                   f'связи, шаблон {_first(places, template=True)}, '
+                   f'код {_first(places, template=False)}: {shape}')
+        if self.mode == 'raise':
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+def current():
+    """Детектор самого вложенного detect_n_plus_one() или None."""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def detect_n_plus_one(mode=None, threshold=None):
+    """Проверяет запросы блока во всех базах.
+
+    Вложенный блок считает запросы отдельно от внешнего, так что
+    несколько запросов к сайту в одном тесте не складываются.
+    """
+    mode = mode or settings.NPLUSONE_DETECTION
+    if mode is None:
+        yield None
+        return
+    detector = NPlusOneDetector(
+        mode, threshold or settings.NPLUSONE_THRESHOLD)
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    _local.stack.append(detector)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(detector))
+            yield detector
+    finally:
+        _local.stack.remove(detector)
+
+
+class DetectionResultMixin:
+    """Проверяет каждый тест на N+1 от startTest до stopTest."""
+
+    def startTest(self, test):
+        self._detection = ExitStack()
+        self._detection.enter_context(detect_n_plus_one())
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self._detection.close()
+
+
+class NPlusOneTestResult(DetectionResultMixin, unittest.TextTestResult):
+    pass
+
+
+class NPlusOneRemoteTestResult(DetectionResultMixin, RemoteTestResult):
+    pass
+
+
+class NPlusOneRemoteTestRunner(RemoteTestRunner):
+    resultclass = NPlusOneRemoteTestResult
+
+
+class NPlusOneParallelTestSuite(ParallelTestSuite):
+    runner_class = NPlusOneRemoteTestRunner
+
+
+class NPlusOneTestRunner(DiscoverRunner):
+    """Тестовый раннер, проверяющий каждый тест на N+1.
+
+    Работает и с --parallel: там тесты выполняются в дочерних процессах
+    со своими результатами.
+    """
+
+    parallel_test_suite = NPlusOneParallelTestSuite
+
+    def get_resultclass(self):
+        return super().get_resultclass() or NPlusOneTestResult
@@ -0,0 +1,80 @@
+"""Разделение чтений и записей между основной базой и репликами.
+
+Записи всегда идут в default. Чтения уходят в одну из реплик из
+settings.REPLICA_DATABASES только внутри use_replicas(): его включает
+ReplicaPinMiddleware для GET-запросов. Команды, миграции и оболочка
+работают с основной базой, а пока список реплик пуст, всё работает
+с default.
+
+Запрос читает из основной базы в представлениях с декоратором
+primary_db, в админке, на не-GET запросах и в течение
+REPLICA_PIN_SECONDS секунд после записи, пока у пользователя есть
+кука REPLICA_PIN_COOKIE. Так автор сразу видит свой пост, даже если
+реплика ещё отстаёт.
+"""
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY_DATABASE = 'default'
+# Сессии меняются при каждом входе и должны читаться без отставания.
+PRIMARY_APPS = {'sessions'}
+
+_state = threading.local()
+
+
+def reads_from_replicas():
+    return getattr(_state, 'replicas', False)
+
+
+def pin_primary():
+    """Закрепляет оставшиеся чтения запроса за основной базой."""
+    _state.replicas = False
+
+
+@contextmanager
+def use_replicas(enabled=True):
+    previous = reads_from_replicas()
+    _state.replicas = enabled
+    try:
+        yield
+    finally:
+        _state.replicas = previous
+
+
+def use_primary():
+    return use_replicas(False)
+
+
+def primary_db(view):
+    """Представление читает только из основной базы."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with use_primary():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.REPLICA_DATABASES
+        if (not replicas or not reads_from_replicas()
+                or model._meta.app_label in PRIMARY_APPS):
+            return PRIMARY_DATABASE
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY_DATABASE, *settings.REPLICA_DATABASES}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными основной базы.
+        return db not in settings.REPLICA_DATABASES
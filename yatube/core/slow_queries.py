@@ -0,0 +1,186 @@
+"""Журнал медленных запросов с планами выполнения.
+
+SlowQueryLog — обёртка connection.execute_wrapper: запросы дольше
+settings.SLOW_QUERY_MS миллисекунд она копит в памяти, сгруппировав по
+форме запроса (SQL без значений параметров и литералов). После запроса
+flush() добавляет накопленное в SlowQuery; для нового вида запроса или
+нового максимума времени сохраняются вызов с параметрами, представление
+и EXPLAIN QUERY PLAN. Таблица видна в админке, самые затратные сверху.
+
+Для запросов HTTP журнал ведёт SlowQueryMiddleware, для команд и
+оболочки — capture_slow_queries().
+"""
+import hashlib
+import logging
+import re
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+EXPLAINED_STATEMENTS = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'}
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDERS = re.compile(r'%s|\?')
+_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """Форма запроса: литералы и параметры заменены на ?, списки IN
+    схлопнуты, пробелы нормализованы."""
+    sql = _STRINGS.sub('?', sql)
+    sql = _NUMBERS.sub('?', sql)
+    sql = _PLACEHOLDERS.sub('?', sql)
+    sql = _LISTS.sub('(...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.sha1(sql.encode()).hexdigest()
+
+
+def _example(sql, params, many):
+    if many:
+        params = next(iter(params), ())
+    if not params:
+        return sql
+    try:
+        return sql % tuple(repr(param) for param in params)
+    except (TypeError, ValueError):
+        return f'{sql} -- {params!r}'
+
+
+def _format_plan(rows, vendor):
+    """Текст плана; для SQLite вложенность передаётся отступами."""
+    if vendor != 'sqlite':
+        return '\n'.join(' '.join(map(str, row)) for row in rows)
+    depth = {0: 0}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, 0) + 1
+        lines.append('  ' * (depth[node] - 1) + detail)
+    return '\n'.join(lines)
+
+
+def explain(sql, params, many, using):
+    """План запроса или пустая строка, если его не получить."""
+    words = sql.split(None, 1)
+    if not words or words[0].upper() not in EXPLAINED_STATEMENTS:
+        return ''
+    if many:
+        params = next(iter(params), ())
+    connection = connections[using]
+    prefix = 'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else (
+        'EXPLAIN')
+    try:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            rows = cursor.fetchall()
+    except DatabaseError:
+        return ''
+    return _format_plan(rows, connection.vendor)
+
+
+class SlowQueryLog:
+    """Медленные запросы, накопленные в одном процессе до flush()."""
+
+    def __init__(self, threshold, view=''):
+        self.threshold = threshold
+        self.view = view
+        self.entries = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            if duration > self.threshold:
+                self.add(sql, params, many, duration,
+                         context['connection'].alias)
+
+    def add(self, sql, params, many, duration, using):
+        shape = normalize(sql)
+        entry = self.entries.get(shape)
+        if entry is None:
+            entry = self.entries[shape] = defaultdict(float)
+        entry['calls'] += 1
+        entry['total_time'] += duration
+        if duration > entry['max_time']:
+            entry.update(max_time=duration, slowest=(sql, params, many,
+                                                     using, self.view))
+
+    def flush(self):
+        """Добавляет накопленное в SlowQuery и очищает журнал."""
+        entries, self.entries = self.entries, {}
+        for shape, entry in entries.items():
+            try:
+                record(shape, entry)
+            except DatabaseError:
+                logger.exception('Не удалось записать медленный запрос')
+
+
+def _slowest(entry):
+    sql, params, many, using, view = entry['slowest']
+    return {
+        'max_time': entry['max_time'],
+        'view': view,
+        'example': _example(sql, params, many),
+        'plan': explain(sql, params, many, using),
+    }
+
+
+def record(shape, entry):
+    from .models import SlowQuery
+
+    queryset = SlowQuery.objects.filter(fingerprint=fingerprint(shape))
+    current = queryset.values_list('max_time', flat=True).first()
+    if current is None:
+        try:
+            with transaction.atomic():
+                SlowQuery.objects.create(
+                    fingerprint=fingerprint(shape), sql=shape,
+                    calls=entry['calls'], total_time=entry['total_time'],
+                    **_slowest(entry))
+            return
+        except IntegrityError:
+            # Ту же форму одновременно записал другой процесс.
+            current = queryset.values_list('max_time', flat=True).first()
+    changes = {
+        'calls': F('calls') + int(entry['calls']),
+        'total_time': F('total_time') + entry['total_time'],
+        'last_seen': timezone.now(),
+    }
+    if entry['max_time'] > current:
+        changes.update(_slowest(entry))
+    queryset.update(**changes)
+
+
+@contextmanager
+def capture_slow_queries(view='', threshold=None):
+    """Пишет медленные запросы блока во всех базах в SlowQuery.
+
+    Если порог не задан ни аргументом, ни в SLOW_QUERY_MS, журнал
+    не ведётся и в блок передаётся None.
+    """
+    if threshold is None:
+        threshold = settings.SLOW_QUERY_MS
+    if threshold is None:
+        yield None
+        return
+    log = SlowQueryLog(threshold, view)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(log))
+            yield log
+    finally:
+        log.flush()
@@ -0,0 +1,52 @@
+import time
+from functools import wraps
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import (DjangoTemplates, Template,
+                                             reraise)
+
+from . import timing
+
+
+def timed_processor(processor):
+    @wraps(processor)
+    def wrapper(request):
+        started = time.perf_counter()
+        try:
+            return processor(request)
+        finally:
+            timing.add('context', time.perf_counter() - started)
+    return wrapper
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.add('template', time.perf_counter() - started)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, учитывающий отрисовку в Server-Timing.
+
+    Время шаблона включает контекст-процессоры; их доля
+    отдельно записывается в ctx.
+    """
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.engine.template_context_processors = tuple(
+            timed_processor(processor)
+            for processor in self.engine.template_context_processors)
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
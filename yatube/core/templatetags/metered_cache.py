@@ -0,0 +1,52 @@
+from django import template
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from core import metrics
+
+register = template.Library()
+
+
+class MeteredCacheNode(template.Node):
+    def __init__(self, nodelist, name, expire_time, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.expire_time = expire_time
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        key = make_template_fragment_key(
+            self.fragment_name,
+            [var.resolve(context) for var in self.vary_on])
+        value = cache.get(key)
+        metrics.inc('yatube_cache_requests_total',
+                    cache=self.name.resolve(context),
+                    result='miss' if value is None else 'hit')
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, self.expire_time.resolve(context))
+        return value
+
+
+@register.tag
+def metered_cache(parser, token):
+    """{% cache %}, считающий попадания и промахи в метриках.
+
+    Первый аргумент — значение метки cache в yatube_cache_requests_total,
+    остальные — как у {% cache %}:
+
+        {% metered_cache 'feed' 600 feed_posts page_obj.number %}
+    """
+    nodelist = parser.parse(('endmetered_cache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 4:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]!r} tag requires at least 3 arguments.')
+    return MeteredCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        bits[3],
+        [parser.compile_filter(bit) for bit in bits[4:]])
@@ -0,0 +1,32 @@
+"""Общие классы тестов проекта.
+
+Данные тестового класса создаются один раз в setUpClass, а между
+тестами база откатывается к ним транзакцией. TestCase вдобавок перед
+каждым тестом даёт ему свои копии объектов моделей, сохранённых в
+атрибутах класса: изменения self.post в одном тесте не видны в
+следующем, как и изменения в базе.
+"""
+from copy import deepcopy
+
+from django import test
+from django.db.models import Model
+
+
+def _is_fixture(value):
+    if isinstance(value, Model):
+        return True
+    return (isinstance(value, (list, tuple)) and bool(value)
+            and all(isinstance(item, Model) for item in value))
+
+
+class TestCase(test.TestCase):
+
+    def _pre_setup(self):
+        super()._pre_setup()
+        # Общий memo: связанные объекты копий ссылаются на копии же,
+        # например self.post.author is self.user.
+        memo = {}
+        for klass in reversed(type(self).__mro__):
+            for name, value in vars(klass).items():
+                if _is_fixture(value):
+                    setattr(self, name, deepcopy(value, memo))
@@ -0,0 +1,26 @@
+from django.db import connection
+from django.test import override_settings
+
+from core.db import apply_sqlite_pragmas
+from core.testing import TestCase
+
+
+class SqlitePragmasTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4321})
+    def test_pragmas_are_applied_to_new_connections(self):
+        """Прагмы из настроек выполняются при подключении"""
+        default = self.pragma('cache_size')
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        self.assertEqual(self.pragma('cache_size'), -4321)
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA cache_size = {default}')
+
+    def test_no_pragmas_by_default(self):
+        """Без SQLITE_PRAGMAS соединение не меняется"""
+        with self.assertNumQueries(0):
+            apply_sqlite_pragmas(sender=None, connection=connection)
@@ -0,0 +1,118 @@
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from core.testing import TestCase
+from posts.models import Post, User
+
+
+class MetricsDirMixin:
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.metrics_dir = directory.name
+        settings_override = override_settings(METRICS_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        metrics._store_pid = None
+        self.addCleanup(setattr, metrics, '_store_pid', None)
+
+
+class MmapStoreTest(MetricsDirMixin, SimpleTestCase):
+    def test_values_are_summed_across_processes(self):
+        """Значения из файлов разных процессов складываются"""
+        first = metrics.MmapStore(
+            os.path.join(self.metrics_dir, 'metrics_1.db'))
+        second = metrics.MmapStore(
+            os.path.join(self.metrics_dir, 'metrics_2.db'))
+        first.inc('requests|', 2)
+        second.inc('requests|', 3)
+        second.inc('ключ|', 0.5)
+        self.assertEqual(
+            dict(metrics.collect()), {'requests|': 5, 'ключ|': 0.5})
+
+    def test_store_reopens_existing_file(self):
+        """Повторно открытый файл продолжает счёт и растёт"""
+        path = os.path.join(self.metrics_dir, 'metrics_1.db')
+        store = metrics.MmapStore(path)
+        for i in range(3000):
+            store.inc(f'key_{i}|')
+        store = metrics.MmapStore(path)
+        store.inc('key_0|')
+        totals = metrics.collect()
+        self.assertEqual(len(totals), 3000)
+        self.assertEqual(totals['key_0|'], 2)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Бакеты гистограммы выводятся накопленными"""
+        for value in (0.001, 0.02, 0.3, 10):
+            metrics.observe(
+                'yatube_request_duration_seconds', value, route='r')
+        text = metrics.render()
+        for sample in (
+                'yatube_request_duration_seconds_bucket'
+                '{route="r",le="0.005"} 1',
+                'yatube_request_duration_seconds_bucket'
+                '{route="r",le="0.025"} 2',
+                'yatube_request_duration_seconds_bucket'
+                '{route="r",le="5"} 3',
+                'yatube_request_duration_seconds_bucket'
+                '{route="r",le="+Inf"} 4',
+                'yatube_request_duration_seconds_count{route="r"} 4'):
+            with self.subTest(sample=sample):
+                self.assertIn(sample, text)
+
+
+class MetricsViewTest(MetricsDirMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_metrics_endpoint(self):
+        """/metrics отдаёт время ответа, запросы к базе и посты"""
+        self.client.get(reverse('posts:index'))
+        self.client.force_login(self.user)
+        self.client.post(reverse('posts:post_create'), {'text': 'Пост'})
+        post = Post.objects.get()
+        self.client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            {'text': 'Исправленный пост'})
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(
+            response['Content-Type'], metrics_content_type())
+        text = response.content.decode()
+        for sample in (
+                'yatube_request_duration_seconds_bucket'
+                '{route="posts:index",le="+Inf"} 1',
+                'yatube_db_queries_total{route="posts:index"} 1',
+                'yatube_posts_created_total 1',
+                'yatube_posts_edited_total 1'):
+            with self.subTest(sample=sample):
+                self.assertIn(sample, text)
+
+    def test_feed_fragment_cache_hits(self):
+        """Попадания в кэш фрагментов лент видны в метриках"""
+        Post.objects.create(author=self.user, text='Пост')
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        text = self.client.get(reverse('metrics')).content.decode()
+        for result in ('miss', 'hit'):
+            with self.subTest(result=result):
+                self.assertIn(
+                    'yatube_cache_requests_total'
+                    f'{{cache="feed",result="{result}"}} 1', text)
+
+
+def metrics_content_type():
+    from core.views import CONTENT_TYPE
+    return CONTENT_TYPE
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.template import Context, Engine
+from django.urls import reverse
+
+from core.nplusone import NPlusOneError, detect_n_plus_one
+from core.testing import TestCase
+from posts.models import Post, User
+
+TEMPLATE = '''<ul>
+{% for post in posts %}
+  <li>{{ post.author.username }}</li>
+{% endfor %}
+</ul>'''
+
+
+class NPlusOneTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for number in range(3):
+            user = User.objects.create_user(username=f'author_{number}')
+            Post.objects.create(author=user, text='Пост')
+        cls.engine = Engine(loaders=[
+            ('django.template.loaders.locmem.Loader', {'loop.html': TEMPLATE})
+        ])
+
+    def render(self, posts):
+        return self.engine.get_template('loop.html').render(
+            Context({'posts': posts}))
+
+    def test_template_loop_raises(self):
+        """Ленивая связь в цикле шаблона называет строку шаблона"""
+        with self.assertRaisesRegex(NPlusOneError, r'шаблон loop\.html:3'):
+            with detect_n_plus_one('raise'):
+                self.render(Post.objects.all())
+
+    def test_select_related_passes(self):
+        with detect_n_plus_one('raise'):
+            self.render(Post.objects.select_related('author'))
+
+    def test_log_mode(self):
+        with self.assertLogs('core.nplusone', 'WARNING') as logs:
+            with detect_n_plus_one('log'):
+                for post in Post.objects.all():
+                    post.author
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('core/tests/test_nplusone.py:', logs.output[0])
+
+    def test_repeated_access_from_different_lines(self):
+        """Повторные обращения не из цикла не считаются N+1"""
+        with detect_n_plus_one('raise'):
+            Post.objects.first().author
+            Post.objects.first().author
+
+    def test_request_fails_on_n_plus_one(self):
+        """Страница без select_related падает в режиме разработки"""
+        cache.clear()
+        with mock.patch('posts.views.index_posts', Post.objects.all):
+            with self.assertRaisesRegex(
+                    NPlusOneError, r'шаблон posts/index\.html:15'):
+                self.client.get(reverse('posts:index'))
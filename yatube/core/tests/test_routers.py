@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from core.middleware import ReplicaPinMiddleware
+from core.routers import (PrimaryReplicaRouter, primary_db, use_primary,
+                          use_replicas)
+from core.testing import TestCase
+from posts.models import Post, User
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class PrimaryReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def read_alias_in(self, request):
+        aliases = []
+
+        def view(request):
+            aliases.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        response = ReplicaPinMiddleware(view)(request)
+        return aliases[0], response
+
+    def test_reads_go_to_replicas_and_writes_to_primary(self):
+        """Чтения уходят в реплику, записи в основную базу"""
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        with use_replicas():
+            self.assertEqual(self.router.db_for_read(Post), 'replica')
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            with use_primary():
+                self.assertEqual(self.router.db_for_read(Post), 'default')
+            self.assertEqual(self.router.db_for_read(Post), 'replica')
+
+    def test_primary_db_decorator(self):
+        """Представление с primary_db читает из основной базы"""
+        view = primary_db(lambda: self.router.db_for_read(Post))
+        with use_replicas():
+            self.assertEqual(view(), 'default')
+
+    def test_write_pins_user_to_primary(self):
+        """После POST пользователь читает из основной базы"""
+        alias, response = self.read_alias_in(self.factory.post('/'))
+        self.assertEqual(alias, 'default')
+        cookie = response.cookies['pin_primary']
+        self.assertEqual(cookie['max-age'], 10)
+
+        alias, _ = self.read_alias_in(self.factory.get('/'))
+        self.assertEqual(alias, 'replica')
+
+        request = self.factory.get('/')
+        request.COOKIES['pin_primary'] = cookie.value
+        alias, _ = self.read_alias_in(request)
+        self.assertEqual(alias, 'default')
+
+    def test_admin_reads_from_primary(self):
+        """Админка читает из основной базы, лента из реплики"""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        with mock.patch('core.routers.random.choice',
+                        return_value='default') as choice:
+            self.client.get(reverse('admin:posts_post_changelist'))
+            choice.assert_not_called()
+            self.client.get(reverse('posts:index'))
+            choice.assert_called_with(['replica'])
@@ -0,0 +1,101 @@
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core.models import SlowQuery
+from core.slow_queries import capture_slow_queries, normalize
+from core.testing import TestCase
+from posts.models import Group, Post, User
+
+
+class NormalizeTest(SimpleTestCase):
+    def test_literals_and_params_are_replaced(self):
+        """Форма запроса не зависит от значений"""
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE a = %s AND b = 'x''y'\n"
+                      "  AND c IN (1, 2, 3) LIMIT 20"),
+            'SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...) LIMIT ?')
+
+    def test_identifiers_with_digits_are_kept(self):
+        self.assertEqual(
+            normalize('SELECT "t1"."col2" FROM "t1"'),
+            'SELECT "t1"."col2" FROM "t1"')
+
+
+class SlowQueryLogTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        Post.objects.create(author=cls.user, text='Пост', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_same_shape_is_deduplicated(self):
+        """Запросы одной формы складываются в одну запись"""
+        with capture_slow_queries('shell', threshold=0):
+            for pk in (1, 2, 3):
+                list(Post.objects.filter(pk=pk))
+        with capture_slow_queries('shell', threshold=0):
+            list(Post.objects.filter(pk=4))
+        entry = SlowQuery.objects.get(sql__contains='"posts_post"."id" = ?')
+        self.assertEqual(entry.calls, 4)
+        self.assertEqual(entry.view, 'shell')
+        self.assertGreaterEqual(entry.total_time, entry.max_time)
+        self.assertIn('SEARCH', entry.plan)
+        self.assertRegex(entry.example, r'"posts_post"\."id" = \d')
+
+    def test_fast_queries_are_skipped(self):
+        with capture_slow_queries('shell', threshold=10 ** 6):
+            list(Post.objects.all())
+        self.assertFalse(SlowQuery.objects.exists())
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_request_queries_are_logged_with_view(self):
+        """Медленные запросы страницы записываются с её представлением"""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:group_list', args=['group']))
+        views = set(SlowQuery.objects.values_list('view', flat=True))
+        self.assertIn('posts:index', views)
+        self.assertIn('posts:group_list', views)
+        feed = SlowQuery.objects.filter(
+            view='posts:index', sql__contains='FROM "posts_post"').first()
+        self.assertTrue(feed.plan)
+
+    @override_settings(SLOW_QUERY_MS=None)
+    def test_disabled_log(self):
+        self.client.get(reverse('posts:index'))
+        self.assertFalse(SlowQuery.objects.exists())
+
+
+class SlowQueryAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(
+            username='staff', is_staff=True, is_superuser=True)
+        cls.user = User.objects.create_user(username='user')
+        SlowQuery.objects.create(
+            fingerprint='a', sql='SELECT ?', example='SELECT 1',
+            calls=10, total_time=50, max_time=10)
+        SlowQuery.objects.create(
+            fingerprint='b', sql='SELECT ? FROM t', example='SELECT 1 FROM t',
+            calls=1, total_time=200, max_time=200)
+
+    def test_ranked_by_total_time(self):
+        """Админка показывает медленные запросы по убыванию общего времени"""
+        client = Client()
+        client.force_login(self.staff)
+        response = client.get(reverse('admin:core_slowquery_changelist'))
+        self.assertEqual(response.status_code, 200)
+        rows = [entry.sql for entry in response.context['cl'].result_list]
+        self.assertEqual(rows, ['SELECT ? FROM t', 'SELECT ?'])
+
+    def test_staff_only(self):
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('admin:core_slowquery_changelist'))
+        self.assertEqual(response.status_code, 302)
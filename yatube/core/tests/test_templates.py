@@ -0,0 +1,38 @@
+from unittest import mock
+
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core.warmup import warm_up_templates
+
+
+class CachedUrlTest(SimpleTestCase):
+    def render(self, **context):
+        return Template(
+            "{% load cached_url %}{% cached_url 'posts:profile' username %}"
+        ).render(Context(context))
+
+    def test_cached_url_matches_url(self):
+        """cached_url строит ту же ссылку, что и url"""
+        self.assertEqual(
+            self.render(username='leo'),
+            reverse('posts:profile', args=['leo']))
+
+    def test_cached_url_reverses_once(self):
+        """Повторная ссылка берётся из кэша"""
+        with mock.patch('core.templatetags.cached_url.reverse',
+                        return_value='/profile/tolstoy/') as patched:
+            self.render(username='tolstoy')
+            self.render(username='tolstoy')
+        self.assertEqual(patched.call_count, 1)
+
+
+class WarmUpTest(SimpleTestCase):
+    @override_settings(TEMPLATE_WARMUP=['base.html', 'posts/index.html'])
+    def test_warm_up_compiles_templates(self):
+        """Шаблоны из TEMPLATE_WARMUP загружаются при запуске"""
+        with mock.patch('core.warmup.get_template') as get_template:
+            warm_up_templates()
+        get_template.assert_has_calls(
+            [mock.call('base.html'), mock.call('posts/index.html')])
@@ -0,0 +1,21 @@
+from core.testing import TestCase
+from posts.models import Post, User
+
+
+class FixtureCopiesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        cls.posts = [cls.post]
+
+    def test_each_test_gets_copies(self):
+        """Тест меняет свои копии объектов класса, а не сами объекты"""
+        self.user.username = 'changed'
+        self.assertIsNot(self.user, type(self).user)
+        self.assertEqual(type(self).user.username, 'author')
+
+    def test_copies_keep_relations(self):
+        self.assertIs(self.post.author, self.user)
+        self.assertIs(self.posts[0], self.post)
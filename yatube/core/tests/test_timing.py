@@ -0,0 +1,40 @@
+import re
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from core.testing import TestCase
+from core.timing import RouteStats
+from posts.models import Post, User
+
+
+class ServerTimingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_server_timing_header(self):
+        """Ответ содержит время SQL, шаблона и всего запроса"""
+        response = self.client.get(reverse('posts:index'))
+        header = response['Server-Timing']
+        for metric in ('db', 'tpl', 'ctx', 'total'):
+            with self.subTest(metric=metric):
+                self.assertRegex(header, rf'\b{metric};dur=\d+\.\d\d')
+        queries = int(re.search(r'"(\d+) queries"', header).group(1))
+        self.assertEqual(queries, 2)
+
+
+class RouteStatsTest(SimpleTestCase):
+    def test_percentiles_use_rolling_window(self):
+        """Перцентили считаются по последним замерам"""
+        stats = RouteStats(window=100)
+        for duration in range(1, 201):
+            stats.add('route', duration)
+        self.assertEqual(stats.percentiles()['route'], {
+            'count': 100, 'p50': 151, 'p95': 196, 'p99': 200})
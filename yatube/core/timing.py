@@ -0,0 +1,98 @@
+"""Замеры времени запроса для заголовка Server-Timing.
+
+ServerTimingMiddleware (core.middleware) заводит на время запроса
+RequestTimings, в которые обёртка выполнения SQL и движок шаблонов
+core.template_backends складывают число запросов и время. Время ответа
+по маршрутам для всех воркеров копит гистограмма
+yatube_request_duration_seconds в /metrics (см. core.metrics);
+RouteStats считает перцентили в одном процессе, например в
+manage.py loadtest.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+
+ROUTE_WINDOW = 1000
+PERCENTILES = (50, 95, 99)
+
+_local = threading.local()
+
+
+class RequestTimings:
+    __slots__ = ('queries', 'sql', 'template', 'context')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = self.template = self.context = 0.0
+
+    def header(self, total):
+        """Значение Server-Timing; время в миллисекундах."""
+        return ', '.join((
+            f'db;dur={self.sql * 1000:.2f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.2f}',
+            f'ctx;dur={self.context * 1000:.2f}',
+            f'total;dur={total:.2f}',
+        ))
+
+
+def current():
+    """Замеры текущего запроса или None вне запроса."""
+    return getattr(_local, 'timings', None)
+
+
+def start():
+    _local.timings = RequestTimings()
+    return _local.timings
+
+
+def stop():
+    _local.timings = None
+
+
+def add(name, seconds):
+    timings = current()
+    if timings is not None:
+        setattr(timings, name, getattr(timings, name) + seconds)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    """Обёртка connection.execute_wrapper: число и время запросов."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings = current()
+        if timings is not None:
+            timings.queries += 1
+            timings.sql += time.perf_counter() - started
+
+
+class RouteStats:
+    """Скользящие перцентили времени ответа по маршрутам."""
+
+    def __init__(self, window=ROUTE_WINDOW):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def add(self, route, duration):
+        with self._lock:
+            self._samples[route].append(duration)
+
+    def percentiles(self):
+        """{маршрут: {'count': ..., 'p50': ..., 'p95': ..., 'p99': ...}}."""
+        with self._lock:
+            samples = {
+                route: sorted(values)
+                for route, values in self._samples.items()}
+        result = {}
+        for route, values in samples.items():
+            stats = {'count': len(values)}
+            for percentile in PERCENTILES:
+                index = min(len(values) - 1, len(values) * percentile // 100)
+                stats[f'p{percentile}'] = values[index]
+            result[route] = stats
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
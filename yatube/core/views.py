@@ -0,0 +1,10 @@
+from django.http import HttpResponse
+
+from . import metrics as metrics_store
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics(request):
+    """Метрики всех воркеров в формате Prometheus."""
+    return HttpResponse(metrics_store.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.template.loader import get_template
+
+
+def warm_up_templates():
+    """Компилирует шаблоны из settings.TEMPLATE_WARMUP при запуске.
+
+    С кэширующим загрузчиком скомпилированные шаблоны остаются в
+    памяти воркера, и первый запрос не тратит время на разбор.
+    """
+    for name in settings.TEMPLATE_WARMUP:
+        get_template(name)
@@ -1,5 +1,36 @@
+from collections import Counter
+
+from django import forms
 from django.contrib import admin
+from django.db.models import Count
+from django.utils import timezone
+
+from .caching import invalidate_post_feeds
+from .counters import update_posts_counters
+from .export import export_response
 from .models import Post, Group
+from .search import matching_ids, uses_fts
+from .utils import CachedCountPaginator
+
+# Параметры changelist, которые не сужают выборку.
+UNFILTERED_PARAMS = {'p', 'o'}
+
+
+class CachedChoicesField(forms.ModelChoiceField):
+    """ModelChoiceField с готовым списком вариантов.
+
+    Формы list_editable копируют поле для каждой строки, и обычный
+    ModelChoiceField при этом заново выбирает варианты из базы.
+    """
+
+    cached_choices = None
+
+    def _get_choices(self):
+        if self.cached_choices is not None:
+            return self.cached_choices
+        return super()._get_choices()
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -11,10 +42,59 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    show_full_result_count = False
+    actions = ('remove_from_group', 'export_csv')
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not uses_fts():
+            return super().get_search_results(
+                request, queryset, search_term)
+        return queryset.filter(pk__in=matching_ids(search_term)), False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        paginator_class = self.paginator
+        if set(request.GET) <= UNFILTERED_PARAMS:
+            paginator_class = CachedCountPaginator
+        return paginator_class(
+            queryset, per_page, orphans, allow_empty_first_page)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name != 'group':
+            return super().formfield_for_foreignkey(
+                db_field, request, **kwargs)
+        kwargs['form_class'] = CachedChoicesField
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs)
+        if request is not None:
+            if not hasattr(request, '_group_choices'):
+                request._group_choices = list(formfield.choices)
+            formfield.cached_choices = request._group_choices
+            formfield.widget.choices = formfield.cached_choices
+        return formfield
+
+    def remove_from_group(self, request, queryset):
+        queryset = queryset.exclude(group=None).order_by()
+        groups = Counter({
+            row['group']: -row['total']
+            for row in queryset.values('group').annotate(total=Count('pk'))
+        })
+        authors = list(queryset.values_list('author', flat=True).distinct())
+        updated = queryset.update(group=None, updated=timezone.now())
+        update_posts_counters({}, groups)
+        invalidate_post_feeds(authors, groups)
+        self.message_user(request, f'Убрано из групп постов: {updated}')
+    remove_from_group.short_description = 'Убрать из группы'
+
+    def export_csv(self, request, queryset):
+        return export_response(queryset, 'csv', 'posts')
+    export_csv.short_description = 'Выгрузить в CSV'
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
@@ -0,0 +1,190 @@
+"""JSON API только для чтения: посты и группы.
+
+Строки выбираются через .values() только с запрошенными в ?fields=
+столбцами, поэтому объекты моделей не создаются, а автор и группа
+подтягиваются тем же запросом через JOIN. Список постов листается
+курсором ?after= по (-pub_date, -id), как и HTML-лента.
+"""
+from http import HTTPStatus
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from users.forms import User
+
+from .models import Group, Post
+from .utils import decode_cursor, encode_position, posts_after
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated': 'updated',
+    'author': {
+        'username': 'author__username',
+        'first_name': 'author__first_name',
+        'last_name': 'author__last_name',
+    },
+    'group': {
+        'slug': 'group__slug',
+        'title': 'group__title',
+    },
+}
+GROUP_FIELDS = {
+    'id': 'id',
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+    'posts_count': 'posts_count',
+}
+POST_CURSOR_COLUMNS = ('pub_date', 'id')
+
+
+class ApiError(Exception):
+    """Некорректные параметры запроса, отдаются ответом 400."""
+
+
+def json_response(data, status=HTTPStatus.OK):
+    return JsonResponse(
+        data, status=status, encoder=DjangoJSONEncoder,
+        json_dumps_params={'ensure_ascii': False})
+
+
+def error_response(message, status=HTTPStatus.BAD_REQUEST):
+    return json_response({'detail': message}, status=status)
+
+
+def selected_fields(request, schema):
+    """Поля из ?fields=id,text в порядке запроса; по умолчанию все."""
+    value = request.GET.get('fields')
+    if not value:
+        return list(schema)
+    fields = list(dict.fromkeys(
+        field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in schema]
+    if unknown or not fields:
+        raise ApiError(f'Неизвестные поля: {", ".join(unknown)}')
+    return fields
+
+
+def columns(schema, fields, required=()):
+    """Столбцы для .values(): выбранные поля и нужные для курсора."""
+    result = dict.fromkeys(required)
+    for field in fields:
+        spec = schema[field]
+        result.update(dict.fromkeys(
+            spec.values() if isinstance(spec, dict) else (spec,)))
+    return list(result)
+
+
+def serialize(row, schema, fields):
+    item = {}
+    for field in fields:
+        spec = schema[field]
+        if not isinstance(spec, dict):
+            item[field] = row[spec]
+            continue
+        nested = {name: row[column] for name, column in spec.items()}
+        has_value = any(value is not None for value in nested.values())
+        item[field] = nested if has_value else None
+    return item
+
+
+def page_limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError('limit должен быть числом')
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def next_link(request, cursor):
+    query = request.GET.copy()
+    query['after'] = cursor
+    return f'{request.path}?{query.urlencode()}'
+
+
+@require_GET
+def post_list(request):
+    try:
+        fields = selected_fields(request, POST_FIELDS)
+        limit = page_limit(request)
+        posts = Post.objects.all()
+        if request.GET.get('group'):
+            posts = posts.filter(group__in=Group.objects.filter(
+                slug=request.GET['group']))
+        if request.GET.get('author'):
+            posts = posts.filter(author__in=User.objects.filter(
+                username=request.GET['author']))
+        if request.GET.get('after'):
+            position = decode_cursor(request.GET['after'])
+            if position is None:
+                raise ApiError('Некорректный курсор')
+            posts = posts_after(posts, *position)
+    except ApiError as error:
+        return error_response(str(error))
+    rows = list(posts.values(
+        *columns(POST_FIELDS, fields, POST_CURSOR_COLUMNS))[:limit + 1])
+    next_page = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_page = next_link(
+            request, encode_position(rows[-1]['pub_date'], rows[-1]['id']))
+    return json_response({
+        'next': next_page,
+        'results': [serialize(row, POST_FIELDS, fields) for row in rows],
+    })
+
+
+@require_GET
+def post_detail(request, post_id):
+    try:
+        fields = selected_fields(request, POST_FIELDS)
+    except ApiError as error:
+        return error_response(str(error))
+    row = Post.objects.filter(pk=post_id).values(
+        *columns(POST_FIELDS, fields)).first()
+    if row is None:
+        return error_response('Пост не найден', HTTPStatus.NOT_FOUND)
+    return json_response(serialize(row, POST_FIELDS, fields))
+
+
+@require_GET
+def group_list(request):
+    try:
+        fields = selected_fields(request, GROUP_FIELDS)
+        limit = page_limit(request)
+        groups = Group.objects.order_by('pk')
+        if request.GET.get('after'):
+            try:
+                groups = groups.filter(pk__gt=int(request.GET['after']))
+            except ValueError:
+                raise ApiError('Некорректный курсор')
+    except ApiError as error:
+        return error_response(str(error))
+    rows = list(groups.values(
+        *columns(GROUP_FIELDS, fields, ('id',)))[:limit + 1])
+    next_page = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_page = next_link(request, rows[-1]['id'])
+    return json_response({
+        'next': next_page,
+        'results': [serialize(row, GROUP_FIELDS, fields) for row in rows],
+    })
+
+
+@require_GET
+def group_detail(request, slug):
+    try:
+        fields = selected_fields(request, GROUP_FIELDS)
+    except ApiError as error:
+        return error_response(str(error))
+    row = Group.objects.filter(slug=slug).values(
+        *columns(GROUP_FIELDS, fields)).first()
+    if row is None:
+        return error_response('Группа не найдена', HTTPStatus.NOT_FOUND)
+    return json_response(serialize(row, GROUP_FIELDS, fields))
@@ -0,0 +1,95 @@
+"""Замеры производительности горячих путей yatube.
+
+Каждый модуль пакета запускается отдельно из каталога с manage.py
+и работает со своей временной базой, не трогая db.sqlite3:
+
+    python -m posts.benchmarks.feed_indexes --posts 1000000
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+import django
+
+SEED_BATCH_SIZE = 10000
+WORDS = (
+    'пост', 'кот', 'собака', 'город', 'лето', 'зима', 'дорога', 'книга',
+    'музыка', 'сад', 'море', 'ёлка', 'работа', 'друзья', 'вечер', 'утро',
+    'погода', 'фильм', 'поезд', 'река', 'гора', 'обед', 'проект', 'код',
+)
+
+
+def setup(db_name=None, feed_cache=True):
+    """Настраивает Django на отдельную базу и применяет миграции.
+
+    С feed_cache=False фрагменты лент не кэшируются (см. posts.caching),
+    и каждый запрос страницы ленты доходит до базы.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    from django.conf import settings
+    if db_name is None:
+        db_name = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_name
+    settings.DEBUG = False
+    # Журнал медленных запросов и поиск N+1 добавляли бы к замерам свои
+    # EXPLAIN, записи и обход стека.
+    settings.SLOW_QUERY_MS = None
+    settings.NPLUSONE_DETECTION = None
+    if not feed_cache:
+        settings.FEED_CACHE_TIMEOUT = 0
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_name
+
+
+def seed(posts, authors=1000, groups=50, seed_value=0):
+    """Быстро заполняет базу записями с разными авторами и группами."""
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from posts.counters import rebuild_posts_counters
+    from posts.models import Group, Post
+
+    User = get_user_model()
+    rnd = random.Random(seed_value)
+    User.objects.bulk_create(
+        [User(username=f'bench_{i}') for i in range(authors)])
+    Group.objects.bulk_create(
+        [Group(title=f'Группа {i}', slug=f'bench-{i}', description='')
+         for i in range(groups)])
+    author_ids = list(User.objects.values_list('pk', flat=True))
+    group_ids = list(Group.objects.values_list('pk', flat=True)) + [None]
+    table = Post._meta.db_table
+    sql = (f'INSERT INTO {table} '
+           f'(text, pub_date, updated, author_id, group_id) '
+           f'VALUES (%s, %s, %s, %s, %s)')
+    start = timezone.now() - timedelta(minutes=posts)
+    for offset in range(0, posts, SEED_BATCH_SIZE):
+        rows = []
+        for i in range(offset, min(offset + SEED_BATCH_SIZE, posts)):
+            pub_date = connection.ops.adapt_datetimefield_value(
+                start + timedelta(minutes=i))
+            rows.append((
+                ' '.join(rnd.choices(WORDS, k=12)),
+                pub_date,
+                pub_date,
+                rnd.choice(author_ids),
+                rnd.choice(group_ids)))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+    rebuild_posts_counters()
+
+
+def measure(func, repeat=20):
+    """Возвращает медиану и максимум времени вызова func в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
@@ -0,0 +1,52 @@
+"""Пропускная способность JSON API против HTML-главной.
+
+Главная замеряется дважды: с пустым кэшем, когда каждый запрос
+выбирает посты и рисует шаблон, и с прогретым кэшем фрагментов.
+
+    python -m posts.benchmarks.api --posts 100000
+"""
+import argparse
+
+from posts.benchmarks import measure, seed, setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--db', help='файл базы; по умолчанию временный')
+    args = parser.parse_args()
+
+    setup(args.db)
+    from django.core.cache import cache
+    from django.test import Client
+    from django.urls import reverse
+
+    seed(args.posts)
+    client = Client()
+    index = reverse('posts:index')
+    api = reverse('posts:api_post_list')
+
+    def cold_index():
+        cache.clear()
+        client.get(index)
+
+    cases = (
+        ('HTML, пустой кэш', cold_index),
+        ('HTML, кэш', lambda: client.get(index)),
+        ('JSON, 10 постов', lambda: client.get(api, {'limit': 10})),
+        ('JSON, id и text', lambda: client.get(
+            api, {'limit': 10, 'fields': 'id,text'})),
+        ('JSON, 100 постов', lambda: client.get(api, {'limit': 100})),
+    )
+    print(f'{"страница":20} {"медиана, мс":>12} {"макс, мс":>10} '
+          f'{"запросов/с":>11}')
+    for name, func in cases:
+        func()
+        median, worst = measure(func, args.repeat)
+        print(f'{name:20} {median:12.2f} {worst:10.2f} '
+              f'{1000 / median:11.0f}')
+
+
+if __name__ == '__main__':
+    main()
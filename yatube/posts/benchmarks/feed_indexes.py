@@ -0,0 +1,85 @@
+"""План запросов и время ответа лент без составных индексов и с ними.
+
+    python -m posts.benchmarks.feed_indexes --posts 1000000
+"""
+import argparse
+
+from posts.benchmarks import measure, seed, setup
+
+
+def feed_pages():
+    from django.contrib.auth import get_user_model
+
+    from posts.models import Group, Post
+    from posts.utils import encode_cursor
+
+    deep_post = Post.objects.all()[Post.objects.count() // 2]
+    return {
+        'index': '/',
+        'index deep page': '/?page=5000',
+        'index deep cursor': f'/?after={encode_cursor(deep_post)}',
+        'group_list': f'/group/{Group.objects.first().slug}/',
+        'profile': f'/profile/{get_user_model().objects.first().username}/',
+    }
+
+
+def explain(url):
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        Client().get(url)
+    plans = []
+    with connection.cursor() as cursor:
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or 'posts_post' not in sql:
+                continue
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plans.append([row[-1] for row in cursor.fetchall()])
+    return plans
+
+
+def report(title, pages, repeat):
+    from django.test import Client
+
+    client = Client()
+    print(f'== {title}')
+    for name, url in pages.items():
+        median, worst = measure(lambda: client.get(url), repeat)
+        print(f'{name:20} median {median:8.2f} ms   max {worst:8.2f} ms')
+        for plan in explain(url):
+            print('    ' + '; '.join(plan))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--db', help='файл базы; по умолчанию временный')
+    args = parser.parse_args()
+
+    setup(args.db, feed_cache=False)
+    from django.db import connection
+
+    from posts.models import Post
+
+    seed(args.posts)
+    pages = feed_pages()
+    indexes = Post._meta.indexes
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(Post, index)
+    report('без составных индексов', pages, args.repeat)
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.add_index(Post, index)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    report('с индексами (pub_date, id), (group, pub_date), '
+           '(author, pub_date)', pages, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
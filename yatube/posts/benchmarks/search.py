@@ -0,0 +1,43 @@
+"""Поиск по индексу FTS5 против LIKE '%q%' из поиска админки.
+
+Для каждого запроса замеряются первая страница результатов и подсчёт
+всех совпадений, который выполняет changelist админки.
+
+    python -m posts.benchmarks.search --posts 1000000
+"""
+import argparse
+
+from posts.benchmarks import measure, seed, setup
+
+QUERIES = ('кот', 'ёлка', 'музыка поезд', 'несуществующее')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--db', help='файл базы; по умолчанию временный')
+    args = parser.parse_args()
+
+    setup(args.db)
+    from posts.models import Post
+    from posts.search import matching_ids, search_posts
+
+    seed(args.posts)
+    print(f'{"запрос":16} {"FTS5 стр.":>10} {"LIKE стр.":>10} '
+          f'{"FTS5 count":>11} {"LIKE count":>11}')
+    for query in QUERIES:
+        like_posts = Post.objects.select_related(
+            'author', 'group').filter(text__icontains=query)
+        fts_page, _ = measure(lambda: search_posts(query, 10), args.repeat)
+        like_page, _ = measure(lambda: list(like_posts[:10]), args.repeat)
+        fts_count, _ = measure(
+            lambda: Post.objects.filter(pk__in=matching_ids(query)).count(),
+            args.repeat)
+        like_count, _ = measure(like_posts.count, args.repeat)
+        print(f'{query:16} {fts_page:10.2f} {like_page:10.2f} '
+              f'{fts_count:11.2f} {like_count:11.2f}  (мс)')
+
+
+if __name__ == '__main__':
+    main()
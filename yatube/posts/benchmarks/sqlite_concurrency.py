@@ -0,0 +1,104 @@
+"""Конкурентные чтения и записи: SQLite по умолчанию против боевого профиля.
+
+Несколько потоков читают страницы главной, один поток публикует посты,
+как post_create. После каждой операции вызывается
+close_old_connections(), как в конце запроса, поэтому без CONN_MAX_AGE
+поток переподключается на каждую операцию. Каждый профиль работает на
+своей копии базы, так как journal_mode=WAL сохраняется в файле.
+
+    python -m posts.benchmarks.sqlite_concurrency --readers 8 --seconds 10
+"""
+import argparse
+import random
+import shutil
+import threading
+import time
+
+from posts.benchmarks import seed, setup
+
+PAGE_SIZE = 10
+
+
+def run(readers, seconds):
+    """Возвращает (чтений/с, записей/с, ошибок) за seconds секунд."""
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError, close_old_connections
+    from posts.models import Post
+    from posts.views import index_posts
+
+    User = get_user_model()
+    author_ids = list(User.objects.values_list('pk', flat=True))
+    stop = time.monotonic() + seconds
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def loop(operation, counter):
+        rnd = random.Random(counter + str(threading.get_ident()))
+        done = errors = 0
+        while time.monotonic() < stop:
+            try:
+                operation(rnd)
+                done += 1
+            except OperationalError:
+                errors += 1
+            close_old_connections()
+        with lock:
+            counts[counter] += done
+            counts['errors'] += errors
+
+    def read(rnd):
+        offset = rnd.randrange(100) * PAGE_SIZE
+        list(index_posts()[offset:offset + PAGE_SIZE])
+
+    def write(rnd):
+        Post.objects.create(
+            text='Новый пост', author_id=rnd.choice(author_ids))
+
+    threads = [threading.Thread(target=loop, args=(read, 'reads'))
+               for _ in range(readers)]
+    threads.append(threading.Thread(target=loop, args=(write, 'writes')))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (counts['reads'] / seconds, counts['writes'] / seconds,
+            counts['errors'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--db', help='файл базы; по умолчанию временный')
+    args = parser.parse_args()
+
+    db_name = setup(args.db)
+    from django.conf import settings
+    from django.db import connections
+    from yatube import settings_production
+
+    seed(args.posts)
+    connections.close_all()
+    production_db = db_name + '.production'
+    shutil.copyfile(db_name, production_db)
+    database = settings.DATABASES['default']
+    profiles = (
+        ('по умолчанию', db_name, 0, {}, {}),
+        ('боевой', production_db,
+         settings_production.DATABASES['default']['CONN_MAX_AGE'],
+         settings_production.DATABASES['default']['OPTIONS'],
+         settings_production.SQLITE_PRAGMAS),
+    )
+    print(f'{"профиль":14} {"чтений/с":>10} {"записей/с":>10} '
+          f'{"ошибок":>7}')
+    for name, path, max_age, options, pragmas in profiles:
+        connections.close_all()
+        database.update(NAME=path, CONN_MAX_AGE=max_age, OPTIONS=options)
+        settings.SQLITE_PRAGMAS = pragmas
+        reads, writes, errors = run(args.readers, args.seconds)
+        print(f'{name:14} {reads:10.0f} {writes:10.0f} {errors:7}')
+
+
+if __name__ == '__main__':
+    main()
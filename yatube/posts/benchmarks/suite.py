@@ -0,0 +1,188 @@
+"""Набор замеров горячих операций с постами и группами.
+
+Для каждого размера базы (по умолчанию 10^3, 10^5 и 10^6 постов)
+создаётся своя временная база, и на ней замеряются: создание поста
+через PostForm, первая и глубокая страницы главной, число постов
+автора, поиск группы по slug и правка поста через post_edit.
+
+Каждый запуск дописывается строкой JSON в файл истории. С --baseline
+результаты сравниваются с сохранённым базовым запуском: операции,
+медиана которых выросла больше чем на --threshold, выводятся как
+регрессии, и команда завершается с кодом 1. --save-baseline сохраняет
+текущий запуск как базовый.
+
+    python -m posts.benchmarks.suite --sizes 1000 100000 --repeat 50
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from posts.benchmarks import measure, seed, setup
+
+SIZES = (10 ** 3, 10 ** 5, 10 ** 6)
+HERE = os.path.dirname(os.path.abspath(__file__))
+HISTORY = os.path.join(HERE, 'history.jsonl')
+BASELINE = os.path.join(HERE, 'baseline.json')
+THRESHOLD = 0.2
+
+
+def use_database(path):
+    """Переключает default на новую базу и применяет миграции."""
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.db import connections
+
+    from posts import lookups
+
+    connections.close_all()
+    settings.DATABASES['default']['NAME'] = path
+    call_command('migrate', verbosity=0)
+    cache.clear()
+    lookups.clear()
+
+
+def cases():
+    """{имя: функция} для уже заполненной базы."""
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory
+
+    from posts import lookups
+    from posts.counters import author_posts_count_by_id
+    from posts.forms import PostForm
+    from posts.models import Group, Post
+    from posts.utils import CachedCountPaginator, paginate
+    from posts.views import POSTS_ON_SCREEN, index_posts, post_edit
+
+    User = get_user_model()
+    factory = RequestFactory()
+    author = User.objects.order_by('-stats__posts_count').first()
+    group = Group.objects.order_by('-posts_count').first()
+    post = Post.objects.filter(author=author).first()
+    deep_page = max(1, Post.objects.count() // POSTS_ON_SCREEN // 2)
+
+    def create_post_form():
+        form = PostForm({'text': 'Новый пост', 'group': group.pk})
+        form.is_valid()
+        new_post = form.save(commit=False)
+        new_post.author = author
+        new_post.save()
+
+    def feed_page(number):
+        request = factory.get('/', {'page': number})
+        page = paginate(request, index_posts(), POSTS_ON_SCREEN,
+                        paginator_class=CachedCountPaginator)
+        list(page.object_list)
+
+    def author_count():
+        author_posts_count_by_id(lookups.authors.get(author.username).pk)
+
+    def group_by_slug():
+        lookups.groups.get(group.slug)
+
+    def edit_post():
+        request = factory.post(
+            f'/posts/{post.pk}/edit/',
+            {'text': 'Исправленный пост', 'group': group.pk})
+        request.user = author
+        post_edit(request, post.pk)
+
+    return {
+        'create_post_form': create_post_form,
+        'feed_page': lambda: feed_page(1),
+        'deep_page': lambda: feed_page(deep_page),
+        'author_count': author_count,
+        'group_by_slug': group_by_slug,
+        'post_edit': edit_post,
+    }
+
+
+def run(sizes, repeat, directory):
+    results = {}
+    for size in sizes:
+        use_database(os.path.join(directory, f'suite_{size}.sqlite3'))
+        seed(size, authors=min(1000, size), groups=50)
+        results[str(size)] = {}
+        for name, func in cases().items():
+            func()
+            median, worst = measure(func, repeat)
+            results[str(size)][name] = {
+                'median_ms': round(median, 4), 'max_ms': round(worst, 4)}
+            print(f'{size:>8} {name:18} {median:10.3f} {worst:10.3f}')
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def regressions(results, baseline, threshold):
+    """[(размер, операция, было, стало)] для медиан, выросших больше
+    чем на threshold."""
+    found = []
+    for size, operations in results.items():
+        for name, timing in operations.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            if timing['median_ms'] > before['median_ms'] * (1 + threshold):
+                found.append(
+                    (size, name, before['median_ms'], timing['median_ms']))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--history', default=HISTORY)
+    parser.add_argument(
+        '--baseline', nargs='?', const=BASELINE,
+        help=f'сравнить с базовым запуском, по умолчанию {BASELINE}')
+    parser.add_argument('--save-baseline', nargs='?', const=BASELINE)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    setup(os.path.join(directory, 'suite.sqlite3'))
+    print(f'{"постов":>8} {"операция":18} {"медиана, мс":>10} '
+          f'{"макс, мс":>10}')
+    results = run(args.sizes, args.repeat, directory)
+    record = {
+        'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    with open(args.history, 'a', encoding='utf-8') as history:
+        history.write(json.dumps(record, ensure_ascii=False) + '\n')
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as baseline:
+            json.dump(record, baseline, ensure_ascii=False, indent=2)
+    if not args.baseline:
+        return
+    with open(args.baseline, encoding='utf-8') as baseline:
+        saved = json.load(baseline)
+    found = regressions(results, saved['results'], args.threshold)
+    for size, name, before, after in found:
+        print(f'РЕГРЕССИЯ {size} {name}: {before:.3f} -> {after:.3f} мс '
+              f'(+{(after / before - 1) * 100:.0f}%)')
+    if found:
+        sys.exit(1)
+    print(f'Регрессий больше {args.threshold:.0%} нет '
+          f'(база {saved.get("commit")} от {saved["time"]})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Время отрисовки posts/index.html для 10 и 100 постов.
+
+Сравниваются три варианта: разбор шаблонов на каждый запрос и {% url %}
+(как при DEBUG = True), кэширующий загрузчик с {% url %} и кэширующий
+загрузчик с {% cached_url %}, как в yatube.settings_production.
+Посты создаются в памяти, база не используется, а кэш фрагментов
+отключён нулевым временем жизни.
+
+    python -m posts.benchmarks.templates
+"""
+import argparse
+import os
+from datetime import timedelta
+
+from posts.benchmarks import measure, setup
+
+TEMPLATE = 'posts/index.html'
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+BASE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def backend(cached, plain_urls):
+    """Движок шаблонов проекта с заданными загрузчиками."""
+    from django.conf import settings
+    from django.template.backends.django import DjangoTemplates
+
+    loaders = list(BASE_LOADERS)
+    if plain_urls:
+        path = os.path.join(settings.TEMPLATES_DIR, TEMPLATE)
+        with open(path, encoding='utf-8') as source:
+            template = source.read().replace('{% cached_url ', '{% url ')
+        loaders.insert(
+            0, ('django.template.loaders.locmem.Loader',
+                {TEMPLATE: template}))
+    if cached:
+        loaders = [(CACHED_LOADER, loaders)]
+    params = {**settings.TEMPLATES[0], 'NAME': 'bench', 'APP_DIRS': False}
+    del params['BACKEND']
+    params['OPTIONS'] = {
+        **params['OPTIONS'], 'loaders': loaders, 'debug': not cached}
+    return DjangoTemplates(params)
+
+
+def context(posts_count):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from posts.caching import FeedCache
+    from posts.models import Group, Post
+    from posts.utils import PostPaginator
+
+    User = get_user_model()
+    authors = [User(username=f'author_{i}', first_name='Автор')
+               for i in range(10)]
+    groups = [Group(title=f'Группа {i}', slug=f'group-{i}')
+              for i in range(5)]
+    now = timezone.now()
+    posts = [
+        Post(id=i, text=f'Текст поста {i}', author=authors[i % 10],
+             group=groups[i % 5] if i % 3 else None,
+             pub_date=now - timedelta(minutes=i))
+        for i in range(1, posts_count + 1)]
+    paginator = PostPaginator(posts, posts_count, count=posts_count * 50)
+    return {
+        'title': 'Последние обновления на сайте',
+        'page_obj': paginator.page(1),
+        'feed_cache': FeedCache('bench', 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth.models import AnonymousUser
+    from django.test import RequestFactory
+
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    variants = (
+        ('без кэша, url', backend(cached=False, plain_urls=True)),
+        ('кэш, url', backend(cached=True, plain_urls=True)),
+        ('кэш, cached_url', backend(cached=True, plain_urls=False)),
+    )
+    print(f'{"вариант":18} {"10 постов, мс":>14} {"100 постов, мс":>15}')
+    for name, engine in variants:
+        timings = []
+        for posts_count in (10, 100):
+            data = context(posts_count)
+
+            def render():
+                engine.get_template(TEMPLATE).render(data, request)
+
+            render()
+            timings.append(measure(render, args.repeat)[0])
+        print(f'{name:18} {timings[0]:14.2f} {timings[1]:15.2f}')
+
+
+if __name__ == '__main__':
+    main()
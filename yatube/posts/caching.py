@@ -0,0 +1,134 @@
+"""Кэширование лент постов.
+
+У каждой ленты (главная, группа, профиль) есть версия в кэше. Версия
+входит в ключ фрагмента шаблона со списком постов, поэтому, чтобы
+сбросить все закэшированные страницы ленты, достаточно сменить её
+версию. Отдельная версия групп сбрасывает все ленты сразу: ссылки на
+группы выводятся в каждой из них.
+
+Реплика может отставать от основной базы до REPLICA_PIN_SECONDS
+секунд (см. core.routers). Страница, прочитанная из реплики в это
+время после смены версии, может не содержать записи, сменившей версию,
+поэтому она не кэшируется и отдаётся без валидаторов. Иначе её получил
+бы по новой версии и автор, читающий из основной базы.
+"""
+import hashlib
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.routers import reads_from_replicas
+
+from .lookups import authors, groups
+from .models import Post
+
+INDEX_FEED = 'index'
+GROUPS_VERSION = 'groups'
+
+FeedCache = namedtuple('FeedCache', 'key timeout')
+
+
+def group_feed(group_id):
+    return f'group:{group_id}'
+
+
+def profile_feed(author_id):
+    return f'profile:{author_id}'
+
+
+def _version_key(feed):
+    return f'posts:feed_version:{feed}'
+
+
+def feed_versions(*feeds):
+    """Возвращает версии лент, заводя недостающие."""
+    keys = [_version_key(feed) for feed in feeds]
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate_feeds(*feeds):
+    now = time.time()
+    cache.set_many({_version_key(feed): now for feed in feeds}, None)
+
+
+def invalidate_post_feeds(author_ids, group_ids):
+    """Сбрасывает главную и ленты перечисленных авторов и групп."""
+    feeds = [INDEX_FEED]
+    feeds += [profile_feed(pk) for pk in set(author_ids) if pk is not None]
+    feeds += [group_feed(pk) for pk in set(group_ids) if pk is not None]
+    invalidate_feeds(*feeds)
+
+
+def replica_may_lag(versions):
+    """Могут ли чтения этого запроса не видеть смену версий."""
+    return (bool(settings.REPLICA_DATABASES) and reads_from_replicas()
+            and time.time() - max(versions) < settings.REPLICA_PIN_SECONDS)
+
+
+def feed_cache(feed, page_obj):
+    """Ключ и время жизни фрагмента со страницей ленты."""
+    versions = feed_versions(feed, GROUPS_VERSION)
+    position = getattr(page_obj, 'cursor', None) or page_obj.number
+    key = ':'.join(str(part) for part in (feed, *versions, position))
+    if replica_may_lag(versions):
+        # Нулевое время жизни: фрагмент отрисуется, но не сохранится.
+        return FeedCache(key, 0)
+    return FeedCache(key, settings.FEED_CACHE_TIMEOUT)
+
+
+def _validators(versions, *parts):
+    if replica_may_lag(versions):
+        return None, None
+    etag = hashlib.md5(
+        ':'.join(str(part) for part in (*versions, *parts)).encode()
+    ).hexdigest()
+    return etag, datetime.fromtimestamp(max(versions), timezone.utc)
+
+
+def index_validators(request):
+    """ETag и Last-Modified главной по версиям лент."""
+    return _validators(
+        feed_versions(INDEX_FEED, GROUPS_VERSION), request.GET.urlencode())
+
+
+def group_validators(request, slug):
+    group = groups.get(slug)
+    if group is None:
+        return None, None
+    return _validators(
+        feed_versions(group_feed(group.pk), GROUPS_VERSION),
+        request.GET.urlencode())
+
+
+def profile_validators(request, username):
+    author = authors.get(username)
+    if author is None:
+        return None, None
+    return _validators(
+        feed_versions(profile_feed(author.pk), GROUPS_VERSION),
+        request.GET.urlencode())
+
+
+def post_validators(request, post_id):
+    """Валидаторы поста: время правки и версия ленты автора.
+
+    Лента автора меняется вместе с его числом постов, которое выводится
+    на странице поста.
+    """
+    row = Post.objects.filter(pk=post_id).values_list(
+        'author_id', 'updated').first()
+    if row is None:
+        return None, None
+    author_id, updated = row
+    versions = feed_versions(profile_feed(author_id), GROUPS_VERSION)
+    return _validators(
+        (*versions, updated.timestamp()), post_id)
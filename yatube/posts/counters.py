@@ -0,0 +1,110 @@
+"""Денормализованные счётчики постов автора и группы."""
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from . import lookups
+from .models import AuthorStats, Group, Post
+
+
+TOTAL_POSTS_COUNT_KEY = 'posts:total_count'
+IDS_CHUNK_SIZE = 500
+
+
+def adjust_total_posts_count(delta):
+    """Сдвигает закэшированное общее число постов, если оно есть."""
+    try:
+        cache.incr(TOTAL_POSTS_COUNT_KEY, delta)
+    except ValueError:
+        pass
+
+
+def count_posts(posts):
+    """Возвращает приращения счётчиков для новых постов."""
+    authors = Counter(post.author_id for post in posts)
+    groups = Counter(
+        post.group_id for post in posts if post.group_id is not None)
+    return authors, groups
+
+
+def _apply_deltas(queryset, deltas):
+    """Одно UPDATE на каждое различное приращение, а не на каждый id."""
+    ids_by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if pk is not None and delta:
+            ids_by_delta[delta].append(pk)
+    for delta, ids in ids_by_delta.items():
+        value = F('posts_count') + delta
+        if delta < 0:
+            # Разошедшийся счётчик не должен нарушить CHECK >= 0.
+            value = Greatest(value, 0)
+        for start in range(0, len(ids), IDS_CHUNK_SIZE):
+            queryset.filter(pk__in=ids[start:start + IDS_CHUNK_SIZE]).update(
+                posts_count=value)
+
+
+def update_posts_counters(authors, groups):
+    """Применяет приращения {id: delta} к счётчикам авторов и групп."""
+    # У каждого поста ровно один автор, поэтому сумма приращений авторов
+    # равна изменению общего числа постов.
+    total_delta = sum(authors.values())
+    if total_delta:
+        adjust_total_posts_count(total_delta)
+    _apply_deltas(Group.objects.all(), groups)
+    growing = [pk for pk, delta in authors.items() if delta > 0]
+    existing = set(AuthorStats.objects.filter(
+        pk__in=growing).values_list('pk', flat=True)) if growing else set()
+    missing = [pk for pk in growing if pk not in existing]
+    _apply_deltas(
+        AuthorStats.objects.all(),
+        {pk: delta for pk, delta in authors.items() if pk not in missing})
+    if missing:
+        # Строк ещё нет: считаем честно, посты к этому моменту сохранены.
+        totals = Post.objects.filter(author_id__in=missing).order_by(
+        ).values('author').annotate(total=Count('pk'))
+        AuthorStats.objects.bulk_create(
+            [AuthorStats(author_id=row['author'], posts_count=row['total'])
+             for row in totals],
+            ignore_conflicts=True)
+
+
+def author_posts_count(author):
+    """Число постов автора, загруженного вместе со stats."""
+    try:
+        return author.stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+# Счётчики объектов из posts.lookups устаревают, как только пост
+# сохранит другой воркер, поэтому для них счётчик читается из базы
+# отдельно: один запрос по первичному ключу.
+
+def group_posts_count(group_id):
+    """Число постов группы по её id."""
+    return Group.objects.filter(pk=group_id).values_list(
+        'posts_count', flat=True).first() or 0
+
+
+def author_posts_count_by_id(author_id):
+    """Число постов автора по его id."""
+    return AuthorStats.objects.filter(pk=author_id).values_list(
+        'posts_count', flat=True).first() or 0
+
+
+@transaction.atomic
+def rebuild_posts_counters():
+    """Пересчитывает все счётчики по таблице постов."""
+    group_posts = Post.objects.filter(
+        group=OuterRef('pk')).order_by().values('group').annotate(
+        total=Count('pk')).values('total')
+    Group.objects.update(posts_count=Coalesce(Subquery(group_posts), 0))
+    AuthorStats.objects.all().delete()
+    AuthorStats.objects.bulk_create(
+        AuthorStats(author_id=row['author'], posts_count=row['total'])
+        for row in Post.objects.order_by().values('author').annotate(
+            total=Count('pk')))
+    lookups.clear()
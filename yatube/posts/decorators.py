@@ -0,0 +1,32 @@
+from django.views.decorators.http import condition
+
+
+def page_validators(request, validators, *args, **kwargs):
+    """Вычисляет валидаторы страницы один раз за запрос."""
+    if not hasattr(request, '_page_validators'):
+        request._page_validators = validators(request, *args, **kwargs)
+    return request._page_validators
+
+
+def conditional_page(validators, anonymous_only=True):
+    """Отвечает 304 анонимам, если страница не менялась.
+
+    validators(request, *args, **kwargs) возвращает пару
+    (etag, last_modified) и вызывается до представления, то есть до
+    выборки записей и отрисовки шаблона. Для авторизованных страница
+    зависит от пользователя, поэтому им она всегда отдаётся целиком.
+    Страницам, одинаковым для всех (например, RSS), передают
+    anonymous_only=False.
+    """
+    def get_validators(request, *args, **kwargs):
+        if anonymous_only and request.user.is_authenticated:
+            return None, None
+        return page_validators(request, validators, *args, **kwargs)
+
+    def etag(request, *args, **kwargs):
+        return get_validators(request, *args, **kwargs)[0]
+
+    def last_modified(request, *args, **kwargs):
+        return get_validators(request, *args, **kwargs)[1]
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
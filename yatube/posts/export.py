@@ -0,0 +1,78 @@
+"""Потоковая выгрузка постов в CSV и JSON.
+
+Строки читаются из базы через .iterator() порциями по CHUNK_SIZE и
+отдаются клиенту по FLUSH_LINES строк, поэтому выгрузка любого размера
+не собирается в памяти целиком. Заголовок CSV или начало массива JSON
+уходят отдельно, ещё до выполнения запроса.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+CHUNK_SIZE = 2000
+FLUSH_LINES = 100
+EXPORT_FIELDS = ('id', 'text', 'pub_date', 'author__username', 'group__slug')
+EXPORT_HEADER = ('id', 'text', 'pub_date', 'author', 'group')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'json': 'application/json; charset=utf-8',
+}
+
+
+class Echo:
+    """Файлоподобный объект, который возвращает записанное."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset):
+    return queryset.order_by('-pub_date', '-pk').values_list(
+        *EXPORT_FIELDS).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _chunked(lines):
+    lines = iter(lines)
+    # Первая строка не ждёт запроса к базе.
+    yield next(lines, '')
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= FLUSH_LINES:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def csv_lines(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_HEADER)
+    for row in export_rows(queryset):
+        yield writer.writerow(row)
+
+
+def json_lines(queryset):
+    yield '['
+    separator = '\n'
+    for row in export_rows(queryset):
+        yield separator + json.dumps(
+            dict(zip(EXPORT_HEADER, row)),
+            cls=DjangoJSONEncoder, ensure_ascii=False)
+        separator = ',\n'
+    yield '\n]\n'
+
+
+def export_response(queryset, export_format, filename):
+    """StreamingHttpResponse с постами в формате csv или json."""
+    if export_format not in CONTENT_TYPES:
+        export_format = 'csv'
+    lines = csv_lines if export_format == 'csv' else json_lines
+    response = StreamingHttpResponse(
+        _chunked(lines(queryset)),
+        content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{export_format}"')
+    return response
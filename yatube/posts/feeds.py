@@ -0,0 +1,136 @@
+"""RSS и Atom ленты главной, групп и авторов.
+
+Лента одинакова для всех читателей, поэтому готовый ответ кладётся в
+кэш под ключом с версиями лент из posts.caching и отдаётся оттуда,
+пока в ленте ничего не поменялось. Валидаторы те же, что у HTML-страниц,
+так что частый опрос обычно заканчивается ответом 304.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.urls import reverse, reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+
+from core import metrics
+
+from .caching import group_validators, index_validators, profile_validators
+from .decorators import conditional_page, page_validators
+from .lookups import authors, groups
+from .views import (CHARACTERS_IN_HEADER, author_post_list, group_post_list,
+                    index_posts)
+
+FEED_ITEMS = 20
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: последние обновления'
+    link = reverse_lazy('posts:index')
+    description = 'Последние обновления на сайте'
+
+    def items(self):
+        return index_posts()[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.text[:CHARACTERS_IN_HEADER]
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.pk])
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated
+
+
+class GroupPostsFeed(LatestPostsFeed):
+
+    def get_object(self, request, slug):
+        return groups.get_or_404(slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=[obj.slug])
+
+    def description(self, obj):
+        return f'Записи сообщества {obj.title}'
+
+    def items(self, obj):
+        return group_post_list(obj)[:FEED_ITEMS]
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+
+    def get_object(self, request, username):
+        return authors.get_or_404(username)
+
+    def title(self, obj):
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=[obj.username])
+
+    def description(self, obj):
+        return f'Записи пользователя {obj.username}'
+
+    def items(self, obj):
+        return author_post_list(obj)[:FEED_ITEMS]
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+def cached_feed(feed, validators):
+    """Представление ленты, отрисованной один раз на версию."""
+    @conditional_page(validators, anonymous_only=False)
+    def view(request, *args, **kwargs):
+        etag, last_modified = page_validators(
+            request, validators, *args, **kwargs)
+        if etag is None:
+            return feed(request, *args, **kwargs)
+        # Путь может содержать длинное имя автора не в ASCII, а ключ
+        # memcached ограничен 250 байтами ASCII, поэтому путь хэшируется.
+        path = hashlib.md5(request.path.encode()).hexdigest()
+        key = f'posts:syndication:{path}:{etag}'
+        response = cache.get(key)
+        metrics.inc('yatube_cache_requests_total', cache='syndication',
+                    result='miss' if response is None else 'hit')
+        if response is None:
+            response = feed(request, *args, **kwargs)
+            cache.set(key, response, settings.FEED_CACHE_TIMEOUT)
+        return response
+    return view
+
+
+index_rss = cached_feed(LatestPostsFeed(), index_validators)
+index_atom = cached_feed(LatestPostsAtomFeed(), index_validators)
+group_rss = cached_feed(GroupPostsFeed(), group_validators)
+group_atom = cached_feed(GroupPostsAtomFeed(), group_validators)
+profile_rss = cached_feed(AuthorPostsFeed(), profile_validators)
+profile_atom = cached_feed(AuthorPostsAtomFeed(), profile_validators)
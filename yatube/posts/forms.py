@@ -1,7 +1,9 @@
-from .models import Post
 from django.forms import ModelForm
 from django import forms
 
+from .lookups import group_choices
+from .models import Post
+
 
 class PostForm(ModelForm):
     class Meta:
@@ -12,6 +14,15 @@ class PostForm(ModelForm):
             'group': 'Группа',
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        field = self.fields['group']
+        choices = group_choices(field)
+        if choices is not None:
+            # Заданные вручную варианты ModelChoiceField не выбирает
+            # из базы повторно.
+            field.choices = choices
+
     def clean_text(self):
         data = self.cleaned_data['text']
         if len(data) == 0:
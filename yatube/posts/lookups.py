@@ -0,0 +1,92 @@
+"""Кэш групп по slug и авторов по username в памяти процесса.
+
+Группы и пользователи меняются редко, а ищутся на каждой странице
+группы и профиля, в RSS и в валидаторах условных запросов. Найденные
+объекты живут в LRU-кэше LOOKUP_CACHE_TTL секунд; сигналы групп и
+пользователей сбрасывают их раньше. Объекты из кэша общие для всех
+запросов процесса, их нельзя изменять. Счётчики постов в них
+устаревают (посты сохраняют и другие воркеры), поэтому их читают из
+базы функциями posts.counters. При LOOKUP_CACHE_TTL = 0 кэш отключён.
+"""
+from django.conf import settings
+from django.http import Http404
+
+from core.lru import LRUCache
+from users.forms import User
+
+from .models import Group
+
+
+class InstanceLookup:
+    """Поиск объекта по уникальному полю через LRU-кэш."""
+
+    def __init__(self, queryset, field, name):
+        self.queryset = queryset
+        self.field = field
+        self.cache = LRUCache(settings.LOOKUP_CACHE_SIZE, name)
+
+    def _load(self, value):
+        return self.queryset.filter(**{self.field: value}).first()
+
+    def get(self, value):
+        """Объект или None, если такого нет."""
+        ttl = settings.LOOKUP_CACHE_TTL
+        if not ttl:
+            return self._load(value)
+        instance = self.cache.get(value)
+        if instance is None:
+            instance = self._load(value)
+            if instance is not None:
+                self.cache.set(value, instance, ttl)
+        return instance
+
+    def get_or_404(self, value):
+        instance = self.get(value)
+        if instance is None:
+            raise Http404(
+                f'{self.queryset.model._meta.object_name} не найден')
+        return instance
+
+    def forget(self, *pks):
+        pks = set(pks)
+        self.cache.delete_if(lambda instance: instance.pk in pks)
+
+    def clear(self):
+        self.cache.clear()
+
+
+groups = InstanceLookup(Group.objects.all(), 'slug', 'groups')
+authors = InstanceLookup(User.objects.all(), 'username', 'authors')
+_group_choices = LRUCache(1, 'group_choices')
+
+
+def group_choices(field):
+    """Варианты поля группы в форме поста; None, если кэш отключён."""
+    ttl = settings.LOOKUP_CACHE_TTL
+    if not ttl:
+        return None
+    choices = _group_choices.get('choices')
+    if choices is None:
+        choices = list(field.choices)
+        _group_choices.set('choices', choices, ttl)
+    return choices
+
+
+def forget_groups(*pks):
+    groups.forget(*pks)
+    _group_choices.clear()
+
+
+def clear():
+    groups.clear()
+    authors.clear()
+    _group_choices.clear()
+
+
+def stats():
+    """Попадания и промахи кэшей этого процесса."""
+    return {
+        'groups': groups.cache.stats(),
+        'authors': authors.cache.stats(),
+        'group_choices': _group_choices.stats(),
+    }
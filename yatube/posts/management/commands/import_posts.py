@@ -0,0 +1,193 @@
+import csv
+import io
+import json
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.models import Group, ImportCheckpoint, Post
+
+User = get_user_model()
+
+LOOKUP_CACHE_SIZE = 100000
+REPORT_INTERVAL = 1.0
+
+
+class LookupCache:
+    """Ограниченный LRU-кэш id по username или slug.
+
+    Неизвестные ключи пачки выбираются из базы одним запросом.
+    """
+
+    def __init__(self, model, field, size=LOOKUP_CACHE_SIZE):
+        self.model = model
+        self.field = field
+        self.size = size
+        self.ids = OrderedDict()
+
+    def resolve(self, keys):
+        missing = {key for key in keys if key not in self.ids}
+        if missing:
+            found = self.model.objects.filter(
+                **{f'{self.field}__in': missing}
+            ).values_list(self.field, 'pk')
+            self.ids.update(found)
+        result = {}
+        for key in keys:
+            if key in self.ids:
+                self.ids.move_to_end(key)
+                result[key] = self.ids[key]
+        while len(self.ids) > self.size:
+            self.ids.popitem(last=False)
+        return result
+
+
+@contextmanager
+def keep_dates():
+    """Не даёт auto_now_add и auto_now затереть даты из файла."""
+    fields = [Post._meta.get_field(name) for name in ('pub_date', 'updated')]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = ('Потоково импортирует посты из JSONL или CSV с полями '
+            'text, author, group, pub_date.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='файл или «-» для stdin')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='по умолчанию определяется по расширению файла')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='число строк в одной транзакции')
+        parser.add_argument(
+            '--checkpoint',
+            help='имя контрольной точки: число импортированных строк '
+                 'хранится в базе и обновляется в одной транзакции с '
+                 'пачкой; повторный запуск с тем же именем продолжит '
+                 'импорт после последней пачки')
+        parser.add_argument(
+            '--skip-unknown', action='store_true',
+            help='пропускать строки с неизвестным автором или группой')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        fmt = options['format'] or (
+            'csv' if source.endswith('.csv') else 'jsonl')
+        self.authors = LookupCache(User, 'username')
+        self.groups = LookupCache(Group, 'slug')
+        self.skip_unknown = options['skip_unknown']
+        checkpoint = options['checkpoint']
+        done = self.read_checkpoint(checkpoint)
+        batch_size = options['batch_size']
+
+        with self.open_source(source) as stream, keep_dates():
+            rows = islice(self.parse(stream, fmt), done, None)
+            started = reported = time.monotonic()
+            imported = 0
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                # Пачка и контрольная точка фиксируются вместе: после
+                # сбоя в любом месте пачка не импортируется дважды.
+                with transaction.atomic():
+                    Post.objects.bulk_create(self.build_posts(batch))
+                    self.write_checkpoint(checkpoint, done + len(batch))
+                done += len(batch)
+                imported += len(batch)
+                if time.monotonic() - reported >= REPORT_INTERVAL:
+                    reported = time.monotonic()
+                    self.report(done, imported, started)
+        self.report(done, imported, started)
+        self.stdout.write(self.style.SUCCESS('Импорт завершён'))
+
+    def report(self, done, imported, started):
+        rate = imported / max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'Обработано строк: {done} ({rate:.0f} строк/с)')
+
+    @contextmanager
+    def open_source(self, source):
+        if source == '-':
+            yield io.TextIOWrapper(
+                sys.stdin.buffer, encoding='utf-8', newline='')
+            return
+        try:
+            stream = open(source, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(error)
+        with stream:
+            yield stream
+
+    def parse(self, stream, fmt):
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise CommandError(f'Строка {number}: {error}')
+
+    def build_posts(self, batch):
+        authors = self.authors.resolve({row.get('author') for row in batch})
+        groups = self.groups.resolve(
+            {row['group'] for row in batch if row.get('group')})
+        now = timezone.now()
+        posts = []
+        for row in batch:
+            slug = row.get('group') or None
+            author_id = authors.get(row.get('author'))
+            group_id = groups.get(slug) if slug else None
+            if (not row.get('text') or author_id is None
+                    or (slug and group_id is None)):
+                if self.skip_unknown:
+                    continue
+                raise CommandError(
+                    f'Неизвестный автор, группа или пустой текст: {row}')
+            pub_date = now
+            if row.get('pub_date'):
+                pub_date = parse_datetime(row['pub_date'])
+                if pub_date is None:
+                    raise CommandError(f'Неверная дата в строке: {row}')
+                if timezone.is_naive(pub_date):
+                    pub_date = timezone.make_aware(pub_date)
+            posts.append(Post(
+                text=row['text'],
+                author_id=author_id,
+                group_id=group_id,
+                pub_date=pub_date,
+                updated=pub_date,
+            ))
+        return posts
+
+    def read_checkpoint(self, name):
+        if not name:
+            return 0
+        return ImportCheckpoint.objects.filter(name=name).values_list(
+            'rows', flat=True).first() or 0
+
+    def write_checkpoint(self, name, done):
+        if not name:
+            return
+        ImportCheckpoint.objects.update_or_create(
+            name=name, defaults={'rows': done})
@@ -0,0 +1,259 @@
+import json
+import random
+import threading
+import time
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urljoin
+from urllib.request import (HTTPCookieProcessor, HTTPRedirectHandler,
+                            build_opener)
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from core.timing import RouteStats
+from posts.models import Group, Post
+
+from .seed import SEED_PASSWORD
+
+User = get_user_model()
+
+DEFAULT_MIX = 'index=40,group_list=20,profile=20,post_detail=15,post_create=5'
+ROUTES = ('index', 'group_list', 'profile', 'post_detail', 'post_create')
+# Из скольких самых популярных групп, авторов и свежих постов
+# выбираются адреса.
+TARGETS = 1000
+
+
+def parse_mix(value):
+    """'index=40,profile=20' -> {'index': 40, 'profile': 20}."""
+    mix = {}
+    for item in value.split(','):
+        route, _, weight = item.partition('=')
+        route = route.strip()
+        if route not in ROUTES:
+            raise CommandError(
+                f'Неизвестный маршрут {route!r}, доступны: '
+                f'{", ".join(ROUTES)}')
+        try:
+            mix[route] = float(weight)
+        except ValueError:
+            raise CommandError(f'Неверный вес маршрута: {item!r}')
+    if not any(weight > 0 for weight in mix.values()):
+        raise CommandError('Все веса маршрутов нулевые')
+    return mix
+
+
+class NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpTransport:
+    """Запросы к запущенному серверу по HTTP."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.cookies = CookieJar()
+        self.opener = build_opener(
+            HTTPCookieProcessor(self.cookies), NoRedirect)
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def request(self, path, data=None):
+        if data is not None:
+            data = urlencode(
+                {**data, 'csrfmiddlewaretoken': self.csrf_token()}).encode()
+        try:
+            with self.opener.open(
+                    urljoin(self.base_url, path), data) as response:
+                response.read()
+                return response.status
+        except HTTPError as error:
+            return error.code
+
+    def login(self, username, password):
+        login = reverse('users:login')
+        self.request(login)
+        status = self.request(
+            login, {'username': username, 'password': password})
+        if status != 302:
+            raise CommandError(
+                f'Не удалось войти как {username}: проверьте --password')
+
+
+class WsgiTransport:
+    """Запросы к WSGI-приложению проекта в этом же процессе."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, path, data=None):
+        if data is None:
+            return self.client.get(path).status_code
+        return self.client.post(path, data).status_code
+
+    def login(self, username, password):
+        self.client.force_login(User.objects.get(username=username))
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест главной, групп, профилей, постов и создания '
+            'поста. Печатает JSON с пропускной способностью и p50/p99 '
+            'времени ответа по маршрутам.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='адрес запущенного сервера, например http://127.0.0.1:8000; '
+                 'по умолчанию запросы идут в WSGI-приложение в процессе')
+        parser.add_argument(
+            '--mix', default=DEFAULT_MIX,
+            help=f'веса маршрутов, по умолчанию {DEFAULT_MIX}')
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument(
+            '--requests', type=int, default=1000,
+            help='общее число запросов')
+        parser.add_argument(
+            '--duration', type=float,
+            help='длительность в секундах вместо --requests')
+        parser.add_argument('--password', default=SEED_PASSWORD)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='файл для отчёта')
+
+    def handle(self, *args, **options):
+        mix = {route: weight
+               for route, weight in parse_mix(options['mix']).items()
+               if weight > 0}
+        self.targets = self.load_targets(mix)
+        self.options = options
+        self.routes = list(mix)
+        self.weights = list(mix.values())
+        self.stats = RouteStats(window=None)
+        self.errors = dict.fromkeys(self.routes, 0)
+        self.lock = threading.Lock()
+        self.remaining = options['requests']
+        self.deadline = None
+        if options['duration']:
+            self.deadline = time.monotonic() + options['duration']
+
+        started = time.monotonic()
+        workers = [random.Random(options['seed'] + number)
+                   for number in range(options['concurrency'])]
+        if len(workers) == 1:
+            self.work(workers[0])
+        else:
+            threads = [threading.Thread(target=self.work_in_thread,
+                                        args=(rnd,))
+                       for rnd in workers]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        report = self.report(time.monotonic() - started)
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(text + '\n')
+        self.stdout.write(text)
+
+    def load_targets(self, mix):
+        targets = {
+            'group_list': list(Group.objects.order_by(
+                '-posts_count').values_list('slug', flat=True)[:TARGETS]),
+            'profile': list(User.objects.filter(
+                stats__posts_count__gt=0).order_by(
+                '-stats__posts_count').values_list(
+                'username', flat=True)[:TARGETS]),
+            'post_detail': list(Post.objects.values_list(
+                'pk', flat=True)[:TARGETS]),
+        }
+        # Посты создают авторы из выборки для профилей.
+        needed = set(mix) | ({'profile'} if 'post_create' in mix else set())
+        for route, values in targets.items():
+            if route in needed and not values:
+                raise CommandError(
+                    f'Нет данных для маршрута {route}: '
+                    f'заполните базу командой seed')
+        return targets
+
+    def transport(self):
+        if self.options['url']:
+            return HttpTransport(self.options['url'])
+        return WsgiTransport()
+
+    def take(self):
+        """Можно ли сделать ещё один запрос."""
+        if self.deadline is not None:
+            return time.monotonic() < self.deadline
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def work(self, rnd):
+        transport = self.transport()
+        if 'post_create' in self.routes:
+            transport.login(
+                rnd.choice(self.targets['profile']), self.options['password'])
+        while self.take():
+            route = rnd.choices(self.routes, self.weights)[0]
+            path, data = self.target(route, rnd)
+            started = time.perf_counter()
+            try:
+                status = transport.request(path, data)
+            except Exception:
+                # Сетевые ошибки, а в WSGI-режиме и исключения
+                # представлений (тестовый клиент их пробрасывает) —
+                # это ошибки запроса, а не повод остановить поток.
+                status = None
+            self.stats.add(route, (time.perf_counter() - started) * 1000)
+            if status is None or status >= 400:
+                with self.lock:
+                    self.errors[route] += 1
+
+    def work_in_thread(self, rnd):
+        try:
+            self.work(rnd)
+        finally:
+            connections.close_all()
+
+    def target(self, route, rnd):
+        if route == 'index':
+            return reverse('posts:index'), None
+        if route == 'post_create':
+            return reverse('posts:post_create'), {
+                'text': f'Пост нагрузочного теста {rnd.random()}'}
+        argument = rnd.choice(self.targets[route])
+        return reverse(f'posts:{route}', args=[argument]), None
+
+    def report(self, elapsed):
+        percentiles = self.stats.percentiles()
+        routes = {}
+        for route in self.routes:
+            stats = percentiles.get(route, {'count': 0})
+            routes[route] = {
+                'requests': stats['count'],
+                'errors': self.errors[route],
+                'rps': round(stats['count'] / elapsed, 1),
+                'p50_ms': round(stats.get('p50', 0), 2),
+                'p99_ms': round(stats.get('p99', 0), 2),
+            }
+        total = sum(route['requests'] for route in routes.values())
+        return {
+            'target': self.options['url'] or 'wsgi',
+            'concurrency': self.options['concurrency'],
+            'seconds': round(elapsed, 2),
+            'requests': total,
+            'errors': sum(self.errors.values()),
+            'rps': round(total / elapsed, 1),
+            'routes': routes,
+        }
@@ -0,0 +1,133 @@
+import itertools
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts.models import Group, Post
+
+from .import_posts import keep_dates
+
+User = get_user_model()
+
+# Пароль всех созданных пользователей: под ним входит manage.py loadtest.
+SEED_PASSWORD = 'yatube-seed'
+# Тексты собираются из готовых предложений: Faker на каждый пост
+# медленнее самой вставки.
+SENTENCE_POOL = 5000
+
+
+def zipf_weights(count, exponent):
+    """Накопленные веса закона Ципфа: k-й элемент весит 1 / k ** exponent."""
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу пользователями, группами и постами: немного '
+            'активных авторов и популярных групп и длинный хвост '
+            'остальных.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='показатель закона Ципфа для авторов и групп; '
+                 'чем больше, тем сильнее перекос')
+        parser.add_argument(
+            '--without-group', type=float, default=0.2,
+            help='доля постов без группы')
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='за сколько последних дней распределить посты')
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--password', default=SEED_PASSWORD)
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 and options['posts']:
+            raise CommandError('Для постов нужен хотя бы один пользователь')
+        self.random = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        started = time.monotonic()
+        authors = self.create_users(options['users'], options['password'])
+        groups = self.create_groups(options['groups'])
+        # Самые активные авторы и популярные группы — случайные, а не
+        # первые по id.
+        self.random.shuffle(authors)
+        self.random.shuffle(groups)
+        self.create_posts(authors, groups, options)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано пользователей: {len(authors)}, групп: {len(groups)}, '
+            f'постов: {options["posts"]} '
+            f'за {time.monotonic() - started:.1f} с'))
+
+    def created_ids(self, model, queryset, objects):
+        """id объектов, созданных bulk_create после последнего id."""
+        last = queryset.order_by('-pk').values_list('pk', flat=True).first()
+        model.objects.bulk_create(objects)
+        return list(queryset.filter(pk__gt=last or 0).order_by(
+            'pk').values_list('pk', flat=True))
+
+    def create_users(self, count, password):
+        first = User.objects.count()
+        # Хэш один на всех: PBKDF2 на каждого пользователя занял бы минуты.
+        password = make_password(password)
+        users = [
+            User(username=f'{self.fake.user_name()}_{number}',
+                 first_name=self.fake.first_name(),
+                 last_name=self.fake.last_name(),
+                 password=password)
+            for number in range(first, first + count)]
+        return self.created_ids(User, User.objects.all(), users)
+
+    def create_groups(self, count):
+        first = Group.objects.count()
+        groups = [
+            Group(title=self.fake.catch_phrase()[:200],
+                  slug=f'group-{number}',
+                  description=self.fake.paragraph())
+            for number in range(first, first + count)]
+        return self.created_ids(Group, Group.objects.all(), groups)
+
+    def create_posts(self, authors, groups, options):
+        count = options['posts']
+        author_weights = zipf_weights(len(authors), options['skew'])
+        group_weights = zipf_weights(len(groups), options['skew'])
+        without_group = options['without_group'] if groups else 1
+        step = timedelta(days=options['days']) / max(count, 1)
+        start = timezone.now() - step * count
+        sentences = self.fake.sentences(SENTENCE_POOL)
+        with keep_dates():
+            for offset in range(0, count, options['batch_size']):
+                numbers = range(
+                    offset, min(offset + options['batch_size'], count))
+                authors_batch = self.random.choices(
+                    authors, cum_weights=author_weights, k=len(numbers))
+                posts = []
+                for number, author_id in zip(numbers, authors_batch):
+                    group_id = None
+                    if self.random.random() >= without_group:
+                        group_id = self.random.choices(
+                            groups, cum_weights=group_weights)[0]
+                    pub_date = start + step * number
+                    posts.append(Post(
+                        text=' '.join(self.random.choices(
+                            sentences, k=self.random.randint(1, 5))),
+                        author_id=author_id,
+                        group_id=group_id,
+                        pub_date=pub_date,
+                        updated=pub_date,
+                    ))
+                with transaction.atomic():
+                    Post.objects.bulk_create(posts)
+                self.stdout.write(f'Постов: {numbers.stop} из {count}')
@@ -9,10 +9,39 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Число постов',
+        default=0,
+        editable=False)
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # posts_count ведут сигналы постов UPDATE-ами в базе (см.
+        # posts.counters), а значение в памяти может устареть, поэтому
+        # обычное сохранение группы его не записывает.
+        if (not self._state.adding and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert')):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'posts_count']
+        super().save(*args, **kwargs)
+
+
+class PostQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        from core import metrics
+        from .caching import invalidate_post_feeds
+        from .counters import count_posts, update_posts_counters
+
+        objs = super().bulk_create(objs, *args, **kwargs)
+        metrics.inc('yatube_posts_created_total', len(objs))
+        authors, groups = count_posts(objs)
+        update_posts_counters(authors, groups)
+        invalidate_post_feeds(authors, groups)
+        return objs
+
 
 class Post(models.Model):
     text = models.TextField(
@@ -21,6 +50,9 @@ class Post(models.Model):
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации',
         auto_now_add=True)
+    updated = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -36,8 +68,53 @@ class Post(models.Model):
         help_text='Выберите группу'
     )
 
+    objects = PostQuerySet.as_manager()
+
     def __str__(self):
         return self.text
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'id'],
+                name='post_pub_date_id_idx'),
+            models.Index(
+                fields=['group', 'pub_date'],
+                name='post_group_pub_date_idx'),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_pub_date_idx'),
+        ]
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор',
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Число постов',
+        default=0,
+        editable=False)
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class ImportCheckpoint(models.Model):
+    """Сколько строк источника уже импортировала команда import_posts."""
+
+    name = models.CharField(
+        verbose_name='Имя',
+        max_length=255,
+        unique=True)
+    rows = models.PositiveIntegerField(
+        verbose_name='Импортировано строк',
+        default=0)
+
+    def __str__(self):
+        return f'{self.name}: {self.rows}'
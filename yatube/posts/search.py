@@ -0,0 +1,105 @@
+"""Полнотекстовый поиск по постам.
+
+На SQLite поиск идёт по виртуальной таблице FTS5 posts_post_fts
+(см. миграцию 0006), которую триггеры синхронизируют с posts_post.
+Индекс хранит текст с «ё», заменённой на «е». Слова запроса ищутся
+по префиксу, а у русских слов сначала отбрасываются типичные
+окончания, поэтому «постами» найдёт «пост» и «посты».
+На других СУБД используется обычный icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+MIN_STEM_LENGTH = 3
+RUSSIAN_ENDINGS = sorted((
+    'ами', 'ями', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'иях', 'ах',
+    'ях', 'ов', 'ев', 'ей', 'ой', 'ый', 'ий', 'ая', 'яя', 'ое', 'ее',
+    'ом', 'ем', 'ам', 'ям', 'ую', 'юю', 'ых', 'их', 'ть', 'ся', 'а',
+    'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь',
+), key=len, reverse=True)
+
+
+def uses_fts():
+    return connection.vendor == 'sqlite'
+
+
+def stem(word):
+    """Грубо отрезает окончание русского слова."""
+    for ending in RUSSIAN_ENDINGS:
+        if (word.endswith(ending)
+                and len(word) - len(ending) >= MIN_STEM_LENGTH):
+            return word[:-len(ending)]
+    return word
+
+
+def match_expression(query):
+    """Строит выражение MATCH: все слова запроса, каждое по префиксу."""
+    words = re.findall(r'\w+', query.lower().replace('ё', 'е'))
+    return ' '.join(f'"{stem(word)}"*' for word in words)
+
+
+def encode_search_cursor(rank, pk):
+    return urlsafe_base64_encode(force_bytes(f'{rank!r}|{pk}'))
+
+
+def decode_search_cursor(cursor):
+    try:
+        rank, pk = force_str(urlsafe_base64_decode(cursor)).split('|')
+        return float(rank), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+
+
+def matching_ids(query):
+    """Выражение для pk__in: id постов, подходящих под запрос."""
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [match_expression(query)])
+
+
+def search_posts(query, limit, cursor=None):
+    """Возвращает (посты, курсор следующей страницы) по релевантности."""
+    if not match_expression(query):
+        return [], None
+    if not uses_fts():
+        return _search_like(query, limit, cursor)
+    sql = (f'SELECT rowid, rank FROM {FTS_TABLE} '
+           f'WHERE {FTS_TABLE} MATCH %s')
+    params = [match_expression(query)]
+    position = decode_search_cursor(cursor) if cursor else None
+    if position is not None:
+        sql += ' AND (rank > %s OR (rank = %s AND rowid > %s))'
+        params += [position[0], position[0], position[1]]
+    sql += ' ORDER BY rank, rowid LIMIT %s'
+    params.append(limit + 1)
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        rows = db_cursor.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_search_cursor(rows[-1][1], rows[-1][0])
+    posts = Post.objects.select_related('author', 'group').in_bulk(
+        [pk for pk, rank in rows])
+    return [posts[pk] for pk, rank in rows if pk in posts], next_cursor
+
+
+def _search_like(query, limit, cursor):
+    posts = Post.objects.select_related('author', 'group').filter(
+        text__icontains=query.strip()).order_by('-pk')
+    position = decode_search_cursor(cursor) if cursor else None
+    if position is not None:
+        posts = posts.filter(pk__lt=position[1])
+    posts = list(posts[:limit + 1])
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_search_cursor(0.0, posts[-1].pk)
+    return posts, next_cursor
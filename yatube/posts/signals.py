@@ -0,0 +1,79 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core import metrics
+
+from . import lookups
+from .caching import GROUPS_VERSION, invalidate_feeds, invalidate_post_feeds
+from .counters import update_posts_counters
+from .models import Group, Post, User
+
+# Поля пользователя, которые выводятся в лентах рядом с его постами.
+AUTHOR_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_init, sender=Post)
+def remember_post_relations(sender, instance, **kwargs):
+    # __dict__ вместо атрибутов: у отложенных полей не должно быть запросов.
+    instance._counted_relations = (
+        instance.__dict__.get('author_id'),
+        instance.__dict__.get('group_id'),
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    metrics.inc(
+        'yatube_posts_created_total' if created
+        else 'yatube_posts_edited_total')
+    old_author, old_group = (
+        (None, None) if created else instance._counted_relations)
+    authors, groups = Counter(), Counter()
+    if instance.author_id != old_author:
+        authors[old_author] -= 1
+        authors[instance.author_id] += 1
+    if instance.group_id != old_group:
+        groups[old_group] -= 1
+        groups[instance.group_id] += 1
+    authors.pop(None, None)
+    update_posts_counters(authors, groups)
+    invalidate_post_feeds(
+        (old_author, instance.author_id), (old_group, instance.group_id))
+    instance._counted_relations = (instance.author_id, instance.group_id)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    update_posts_counters(
+        {instance.author_id: -1}, {instance.group_id: -1})
+    invalidate_post_feeds((instance.author_id,), (instance.group_id,))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    invalidate_feeds(GROUPS_VERSION)
+    lookups.forget_groups(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    lookups.authors.forget(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    # Вход сохраняет только last_login: ленты от этого не меняются.
+    if created or (update_fields is not None
+                   and not AUTHOR_FIELDS.intersection(update_fields)):
+        return
+    # Имя автора выводится в его постах на главной, в профиле и в
+    # лентах групп, где он писал.
+    groups = Post.objects.filter(author=instance.pk).order_by(
+    ).values_list('group', flat=True).distinct()
+    invalidate_post_feeds((instance.pk,), groups)
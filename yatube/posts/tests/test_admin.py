@@ -0,0 +1,69 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.testing import TestCase
+from posts.models import Post, Group, User
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        cls.authors = [
+            User.objects.create_user(username=f'author_{i}')
+            for i in range(5)]
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {i}',
+                slug=f'group_{i}',
+                description='Тестовое описание')
+            for i in range(5)]
+
+    def setUp(self):
+        self.client.force_login(PostAdminTest.admin)
+
+    def create_posts(self, count):
+        Post.objects.bulk_create(
+            [Post(
+                text=f'Пост {i}',
+                author=self.authors[i % len(self.authors)],
+                group=self.groups[i % len(self.groups)])
+                for i in range(count)])
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('admin:posts_post_changelist'))
+        return len(queries)
+
+    def test_changelist_queries_do_not_depend_on_rows(self):
+        """Число запросов changelist не зависит от числа строк"""
+        self.create_posts(2)
+        few_rows = self.changelist_queries()
+        self.create_posts(40)
+        self.assertEqual(self.changelist_queries(), few_rows)
+
+    def test_remove_from_group_action(self):
+        """Действие убирает посты из групп и обновляет счётчики"""
+        self.create_posts(10)
+        self.client.post(reverse('admin:posts_post_changelist'), {
+            'action': 'remove_from_group',
+            '_selected_action': list(
+                Post.objects.values_list('pk', flat=True)),
+        })
+        self.assertFalse(Post.objects.exclude(group=None).exists())
+        self.assertFalse(Group.objects.exclude(posts_count=0).exists())
+
+    def test_export_csv_action(self):
+        """Действие выгружает выбранные посты в CSV"""
+        self.create_posts(3)
+        response = self.client.post(
+            reverse('admin:posts_post_changelist'), {
+                'action': 'export_csv',
+                '_selected_action': list(
+                    Post.objects.values_list('pk', flat=True)),
+            })
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(content.splitlines()), 4)
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+from django.urls import reverse
+
+from core.testing import TestCase
+from posts.models import Post, Group, User
+
+
+class PostApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            [Post(text=f'Пост {i}', author=cls.user, group=cls.group)
+             for i in range(24)])
+        cls.post = Post.objects.create(text='Пост без группы', author=cls.user)
+
+    def test_post_list_embeds_author_and_group(self):
+        """Список постов отдаёт автора и группу одним запросом"""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:api_post_list'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        results = response.json()['results']
+        self.assertEqual(len(results), 20)
+        self.assertEqual(results[0]['text'], 'Пост без группы')
+        self.assertIsNone(results[0]['group'])
+        self.assertEqual(results[0]['author'], {
+            'username': 'author',
+            'first_name': 'Лев',
+            'last_name': 'Толстой',
+        })
+        self.assertEqual(results[1]['group']['slug'], self.group.slug)
+
+    def test_fields_projection(self):
+        """?fields= оставляет только запрошенные поля"""
+        response = self.client.get(
+            reverse('posts:api_post_list'), {'fields': 'id,text'})
+        for item in response.json()['results']:
+            self.assertEqual(list(item), ['id', 'text'])
+        response = self.client.get(
+            reverse('posts:api_post_list'), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_post_list_cursor_pages(self):
+        """Курсор next проходит по всем постам без повторов"""
+        url = reverse('posts:api_post_list') + '?limit=10&fields=id'
+        ids = []
+        while url:
+            data = self.client.get(url).json()
+            ids += [item['id'] for item in data['results']]
+            url = data['next']
+        self.assertEqual(
+            ids, list(Post.objects.values_list('pk', flat=True)))
+        response = self.client.get(
+            reverse('posts:api_post_list'), {'after': 'испорчен'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_post_list_filters(self):
+        """Список постов фильтруется по группе и автору"""
+        response = self.client.get(
+            reverse('posts:api_post_list'),
+            {'group': self.group.slug, 'limit': 100})
+        self.assertEqual(len(response.json()['results']), 24)
+        response = self.client.get(
+            reverse('posts:api_post_list'), {'author': 'nobody'})
+        self.assertEqual(response.json()['results'], [])
+
+    def test_post_detail(self):
+        """Пост отдаётся по id, несуществующий отдаёт 404"""
+        response = self.client.get(reverse(
+            'posts:api_post_detail', kwargs={'post_id': self.post.pk}),
+            {'fields': 'text,author'})
+        self.assertEqual(response.json(), {
+            'text': 'Пост без группы',
+            'author': {
+                'username': 'author',
+                'first_name': 'Лев',
+                'last_name': 'Толстой',
+            },
+        })
+        response = self.client.get(reverse(
+            'posts:api_post_detail', kwargs={'post_id': 0}))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_groups(self):
+        """Группы отдаются списком и по slug"""
+        response = self.client.get(reverse('posts:api_group_list'))
+        self.assertEqual(response.json()['results'][0]['posts_count'], 24)
+        response = self.client.get(reverse(
+            'posts:api_group_detail', kwargs={'slug': self.group.slug}),
+            {'fields': 'title'})
+        self.assertEqual(response.json(), {'title': 'Тестовая группа'})
+        response = self.client.get(reverse(
+            'posts:api_group_detail', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,172 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import OperationalError
+
+from core.testing import TestCase
+from posts.management.commands.import_posts import Command as ImportPosts
+from posts.models import ImportCheckpoint, Post, Group, User
+
+
+class ImportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as source:
+            source.write(content)
+        return path
+
+    def write_jsonl(self, rows):
+        return self.write(
+            'posts.jsonl', '\n'.join(json.dumps(row) for row in rows))
+
+    def test_import_jsonl(self):
+        """Импорт JSONL сохраняет авторов, группы, даты и счётчики"""
+        path = self.write_jsonl([
+            {'text': 'Первый', 'author': 'author', 'group': 'test_slug',
+             'pub_date': '2020-01-01T10:00:00+00:00'},
+            {'text': 'Второй', 'author': 'author'},
+        ])
+        call_command('import_posts', path, batch_size=1, stdout=StringIO())
+        first = Post.objects.get(text='Первый')
+        self.assertEqual(first.group, self.group)
+        self.assertEqual(first.pub_date.year, 2020)
+        self.assertEqual(Post.objects.filter(author=self.user).count(), 2)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+
+    def test_import_csv(self):
+        """Импорт CSV"""
+        path = self.write(
+            'posts.csv', 'text,author,group\nПост из CSV,author,test_slug\n')
+        call_command('import_posts', path, stdout=StringIO())
+        self.assertTrue(Post.objects.filter(
+            text='Пост из CSV', group=self.group).exists())
+
+    def test_import_resumes_from_checkpoint(self):
+        """После сбоя импорт продолжается с последней пачки"""
+        path = self.write_jsonl([
+            {'text': 'Первый', 'author': 'author'},
+            {'text': 'Второй', 'author': 'author'},
+            {'text': 'Сломанный', 'author': 'nobody'},
+        ])
+        with self.assertRaises(CommandError):
+            call_command('import_posts', path, batch_size=2,
+                         checkpoint='posts', stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 2)
+        call_command('import_posts', path, batch_size=2,
+                     checkpoint='posts', skip_unknown=True,
+                     stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(ImportCheckpoint.objects.get(name='posts').rows, 3)
+
+    def test_checkpoint_is_saved_with_batch(self):
+        """Сбой при записи контрольной точки откатывает и пачку"""
+        path = self.write_jsonl(
+            [{'text': f'Пост {number}', 'author': 'author'}
+             for number in range(4)])
+        write_checkpoint = ImportPosts.write_checkpoint
+        calls = []
+
+        def crash_on_second_batch(command, name, done):
+            calls.append(done)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            write_checkpoint(command, name, done)
+
+        with mock.patch.object(
+                ImportPosts, 'write_checkpoint', crash_on_second_batch):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('import_posts', path, batch_size=2,
+                             checkpoint='posts', stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 2)
+        call_command('import_posts', path, batch_size=2,
+                     checkpoint='posts', stdout=StringIO())
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            [f'Пост {number}' for number in range(4)])
+
+
+class SeedTest(TestCase):
+    def test_seed_skews_authors_and_groups(self):
+        """seed создаёт данные с перекосом и верными счётчиками"""
+        call_command('seed', users=20, groups=5, posts=500, batch_size=100,
+                     stdout=StringIO())
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 5)
+        self.assertEqual(Post.objects.count(), 500)
+        heaviest = Group.objects.order_by('-posts_count').first()
+        self.assertEqual(
+            heaviest.posts_count, heaviest.posts.count())
+        self.assertGreater(heaviest.posts_count, 400 / 5)
+        top_author = User.objects.order_by('-stats__posts_count').first()
+        self.assertGreater(top_author.stats.posts_count, 500 / 20)
+        self.assertTrue(top_author.check_password('yatube-seed'))
+
+    def test_seed_is_reproducible(self):
+        call_command('seed', users=3, groups=2, posts=10, stdout=StringIO())
+        first = list(Post.objects.order_by('pk').values_list('text'))
+        Post.objects.all().delete()
+        call_command('seed', users=3, groups=2, posts=10, stdout=StringIO())
+        second = list(Post.objects.order_by('pk').values_list('text'))
+        self.assertEqual(first, second)
+
+
+class LoadTestTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('seed', users=5, groups=2, posts=30, stdout=StringIO())
+
+    def test_report_per_route(self):
+        """loadtest отчитывается JSON-ом по каждому маршруту"""
+        out = StringIO()
+        call_command('loadtest', requests=40, concurrency=1, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['requests'], 40)
+        self.assertEqual(report['errors'], 0)
+        self.assertEqual(set(report['routes']), {
+            'index', 'group_list', 'profile', 'post_detail', 'post_create'})
+        for route, stats in report['routes'].items():
+            with self.subTest(route=route):
+                self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+
+    def test_mix(self):
+        out = StringIO()
+        call_command('loadtest', requests=5, concurrency=1,
+                     mix='index=1,post_create=0', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(list(report['routes']), ['index'])
+        self.assertEqual(report['routes']['index']['requests'], 5)
+
+    def test_view_errors_are_counted(self):
+        """Исключение представления считается ошибкой, а не роняет тест"""
+        out = StringIO()
+        with mock.patch('posts.views.index_posts',
+                        side_effect=OperationalError('database is locked')):
+            call_command('loadtest', requests=5, concurrency=1,
+                         mix='index=1', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['requests'], 5)
+        self.assertEqual(report['errors'], 5)
+
+    def test_unknown_route(self):
+        with self.assertRaises(CommandError):
+            call_command('loadtest', mix='feed=1', stdout=StringIO())
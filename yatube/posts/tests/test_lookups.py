@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core.lru import LRUCache
+from core.testing import TestCase
+from posts import lookups
+from posts.forms import PostForm
+from posts.models import Post, Group, User
+
+
+class LRUCacheTest(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        """Из полного кэша вытесняется самая давняя запись"""
+        lru = LRUCache(2)
+        lru.set('a', 1, 60)
+        lru.set('b', 2, 60)
+        lru.get('a')
+        lru.set('c', 3, 60)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.stats()['evictions'], 1)
+
+    def test_entries_expire(self):
+        """Запись живёт не дольше ttl"""
+        lru = LRUCache(2)
+        with mock.patch('core.lru.time.monotonic', return_value=100):
+            lru.set('a', 1, 10)
+            self.assertEqual(lru.get('a'), 1)
+        with mock.patch('core.lru.time.monotonic', return_value=111):
+            self.assertIsNone(lru.get('a'))
+        stats = lru.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+
+@override_settings(LOOKUP_CACHE_TTL=60)
+class LookupCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        lookups.clear()
+        self.group_url = reverse(
+            'posts:group_list', kwargs={'slug': self.group.slug})
+        self.profile_url = reverse(
+            'posts:profile', kwargs={'username': self.user.username})
+
+    def test_pages_reuse_cached_lookups(self):
+        """Группа и автор ищутся в базе один раз"""
+        misses = lookups.stats()['groups']['misses']
+        for url in (self.group_url, self.profile_url):
+            with self.subTest(url=url):
+                self.client.get(url)
+                cache.clear()
+                # Остаются счётчик постов и выборка постов.
+                with self.assertNumQueries(2):
+                    self.client.get(url)
+        self.assertEqual(lookups.stats()['groups']['misses'], misses + 1)
+
+    def test_group_change_invalidates_lookup(self):
+        """Правка группы видна сразу"""
+        self.client.get(self.group_url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        self.assertContains(self.client.get(self.group_url), 'Новое название')
+
+    def test_counters_are_not_taken_from_cache(self):
+        """Страницы видят новый пост при закэшированных группе и авторе"""
+        self.client.get(self.profile_url)
+        self.client.get(self.group_url)
+        # Пост другого воркера: кэш этого процесса о нём не знает.
+        with mock.patch.object(lookups.InstanceLookup, 'forget'):
+            Post.objects.create(
+                author=self.user, text='Ещё пост', group=self.group)
+        self.assertEqual(lookups.groups.get('test_slug').posts_count, 1)
+        for url in (self.profile_url, self.group_url):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(len(response.context['page_obj']), 2)
+                self.assertEqual(
+                    response.context['page_obj'].paginator.count, 2)
+        self.assertEqual(
+            self.client.get(self.profile_url).context['posts_count'], 2)
+
+    def test_form_group_choices_are_cached(self):
+        """Форма поста берёт список групп из кэша"""
+        list(PostForm().fields['group'].choices)
+        with self.assertNumQueries(0):
+            choices = list(PostForm().fields['group'].choices)
+        self.assertIn((self.group.pk, self.group.title), choices)
+        Group.objects.create(title='Вторая', slug='second', description='')
+        self.assertEqual(len(PostForm().fields['group'].choices), 3)
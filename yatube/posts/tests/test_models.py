@@ -1,6 +1,10 @@
-from django.test import TestCase
+from io import StringIO
 
-from posts.models import Post, Group, User
+from django.core.management import call_command
+
+from core.testing import TestCase
+from posts.counters import author_posts_count
+from posts.models import AuthorStats, Post, Group, User
 
 
 class PostModelTest(TestCase):
@@ -62,3 +66,82 @@ class GroupModelTest(TestCase):
 
     def test_models_have_correct_object_names(self):
         self.assertEqual(str(self.group), 'Тестовая группа')
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='first',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='second',
+            description='Тестовое описание',
+        )
+
+    def assertCounters(self, author, group, other_group):
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(author_posts_count(self.user), author)
+        self.assertEqual(self.group.posts_count, group)
+        self.assertEqual(self.other_group.posts_count, other_group)
+
+    def test_counters_follow_post_changes(self):
+        """Счётчики меняются при создании, переносе и удалении поста."""
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        self.assertCounters(1, 1, 0)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.other_group
+        post.save()
+        self.assertCounters(1, 0, 1)
+        post.group = None
+        post.save()
+        self.assertCounters(1, 0, 0)
+        post.delete()
+        self.assertCounters(0, 0, 0)
+
+    def test_group_save_keeps_counter(self):
+        """Сохранение группы не затирает счётчик постов."""
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        group = Group.objects.get(pk=self.group.pk)
+        Post.objects.create(
+            author=self.user, text='Ещё пост', group=self.group)
+        group.title = 'Новое название'
+        group.save()
+        self.assertCounters(2, 2, 0)
+        self.assertEqual(self.group.title, 'Новое название')
+        post.delete()
+        self.assertCounters(1, 1, 0)
+
+    def test_counters_do_not_go_below_zero(self):
+        """Разошедшийся счётчик при удалении поста остаётся нулём."""
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        Group.objects.update(posts_count=0)
+        AuthorStats.objects.update(posts_count=0)
+        post.delete()
+        self.assertCounters(0, 0, 0)
+
+    def test_counters_follow_bulk_create(self):
+        """bulk_create тоже обновляет счётчики."""
+        Post.objects.bulk_create(
+            [Post(author=self.user, text='Пост', group=self.group)
+             for _ in range(3)])
+        self.assertCounters(3, 3, 0)
+
+    def test_rebuild_posts_counters(self):
+        """Команда пересчитывает испорченные счётчики."""
+        Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        Group.objects.update(posts_count=10)
+        AuthorStats.objects.all().delete()
+        call_command('rebuild_posts_counters', stdout=StringIO())
+        self.assertCounters(1, 1, 0)
@@ -1,8 +1,9 @@
 from http import HTTPStatus
 
-from django.test import TestCase, Client
+from django.test import Client
 from django.urls import reverse
 
+from core.testing import TestCase
 from posts.models import Post, Group, User
 
 
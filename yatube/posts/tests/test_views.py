@@ -1,9 +1,22 @@
+import json
+import time
+from datetime import timedelta
+from http import HTTPStatus
+from unittest import mock
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.test import Client, override_settings
 from django.urls import reverse
 from django import forms
 
+from core.routers import use_replicas
+from core.testing import TestCase
+from posts.caching import INDEX_FEED, feed_cache
 from posts.models import Post, Group
+from posts.utils import PostPaginator, encode_cursor, encode_position
 
 User = get_user_model()
 
@@ -133,6 +146,8 @@ class PaginatorTest(TestCase):
                 for i in range(13)])
 
     def setUp(self):
+        cache.clear()
+        self.guest = Client()
         self.authorized = Client()
         self.authorized.force_login(self.user)
 
@@ -155,3 +170,517 @@ class PaginatorTest(TestCase):
                 self.assertEqual(len(self.authorized.get(
                     page + '?page=2').context.get('page_obj')),
                     posts_on_second_page)
+
+    def test_post_cursor_paginator(self):
+        """Проверка постраничного вывода по курсору"""
+        templates_page_names = [
+            reverse('posts:index'),
+            reverse('posts:group_list',
+                    kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.user.username})
+        ]
+        for page in templates_page_names:
+            with self.subTest(page=page):
+                first_page = self.authorized.get(page).context['page_obj']
+                cursor = encode_cursor(first_page[len(first_page) - 1])
+                second_page = self.authorized.get(
+                    page, {'after': cursor}).context['page_obj']
+                self.assertEqual(len(second_page), 3)
+                self.assertFalse(second_page.has_next())
+                self.assertTrue(second_page.has_previous())
+                back_page = self.authorized.get(
+                    page, {'before': second_page.previous_cursor}
+                ).context['page_obj']
+                self.assertEqual(list(back_page), list(first_page))
+                self.assertFalse(back_page.has_previous())
+
+    @override_settings(POSTS_EXACT_COUNT_LIMIT=0)
+    def test_index_paginator_cached_count(self):
+        """Главная берёт число постов из кэша и поддерживает его"""
+        cache.clear()
+        with self.assertNumQueries(2):
+            self.guest.get(reverse('posts:index'))
+        with self.assertNumQueries(1):
+            response = self.guest.get(reverse('posts:index'), {'page': 2})
+        self.assertEqual(response.context['page_obj'].paginator.count, 13)
+        Post.objects.create(text='Новый пост', author=self.user)
+        response = self.guest.get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 14)
+
+    def test_elided_page_range(self):
+        """Номера страниц выводятся окном вокруг текущей"""
+        paginator = PostPaginator(range(100000), 10)
+        ellipsis = paginator.ELLIPSIS
+        self.assertEqual(
+            paginator.get_elided_page_range(1),
+            [1, 2, 3, ellipsis, 10000])
+        self.assertEqual(
+            paginator.get_elided_page_range(5000),
+            [1, ellipsis, 4998, 4999, 5000, 5001, 5002, ellipsis, 10000])
+        self.assertEqual(
+            paginator.get_elided_page_range(10000),
+            [1, ellipsis, 9998, 9999, 10000])
+        self.assertEqual(
+            PostPaginator(range(30), 10).get_elided_page_range(2), [1, 2, 3])
+
+    def test_paginator_html_does_not_grow_with_pages(self):
+        """Размер навигации не зависит от числа страниц"""
+        response = self.guest.get(
+            reverse('posts:profile', kwargs={'username': self.user.username}))
+        self.assertContains(response, '?page=2')
+        self.assertNotContains(response, PostPaginator.ELLIPSIS)
+        sizes = []
+        post = Post.objects.first()
+        for pages in (100, 10000):
+            page_obj = PostPaginator([post] * pages * 10, 10).page(50)
+            sizes.append(len(render_to_string(
+                'posts/includes/paginator.html', {'page_obj': page_obj})))
+        # Отличаются только длиной номеров последней страницы.
+        self.assertLess(sizes[1] - sizes[0], 10)
+
+    def test_post_cursor_paginator_edges(self):
+        """Курсор за краем ленты даёт пустую страницу без соседних"""
+        oldest = Post.objects.order_by('pub_date', 'pk').first()
+        newest = Post.objects.order_by('-pub_date', '-pk').first()
+        newer = encode_position(
+            newest.pub_date + timedelta(days=1), newest.pk)
+        for params in ({'after': encode_cursor(oldest)}, {'before': newer}):
+            with self.subTest(params=params):
+                response = self.guest.get(reverse('posts:index'), params)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                page_obj = response.context['page_obj']
+                self.assertEqual(len(page_obj), 0)
+                self.assertFalse(page_obj.has_other_pages())
+                self.assertIsNone(page_obj.next_cursor)
+                self.assertIsNone(page_obj.previous_cursor)
+
+    def test_paginator_links_use_cursors(self):
+        """Ссылки «Следующая» и «Предыдущая» ведут по курсору"""
+        page = reverse('posts:index')
+        first_page = self.guest.get(page)
+        next_cursor = first_page.context['page_obj'].next_cursor
+        self.assertContains(first_page, f'?after={next_cursor}')
+        second_page = self.guest.get(page, {'after': next_cursor})
+        previous_cursor = second_page.context['page_obj'].previous_cursor
+        self.assertContains(second_page, f'?before={previous_cursor}')
+        last_page = self.guest.get(page, {'page': 2})
+        previous_cursor = last_page.context['page_obj'].previous_cursor
+        self.assertContains(last_page, f'?before={previous_cursor}')
+
+    def test_post_cursor_paginator_bad_cursor(self):
+        """Испорченный курсор открывает первую страницу"""
+        response = self.authorized.get(
+            reverse('posts:index'), {'after': 'broken'})
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+
+class FeedQueriesTest(TestCase):
+    AUTHORS_COUNT = 15
+    GROUPS_COUNT = 5
+    POSTS_COUNT = 45
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User.objects.bulk_create(
+            [User(username=f'author_{i}')
+             for i in range(cls.AUTHORS_COUNT)])
+        cls.users = list(User.objects.all())
+        Group.objects.bulk_create(
+            [Group(
+                title=f'Группа {i}',
+                slug=f'group_{i}',
+                description='Тестовое описание')
+                for i in range(cls.GROUPS_COUNT)])
+        cls.groups = list(Group.objects.all())
+        Post.objects.bulk_create(
+            [Post(
+                text=f'Пост {i}',
+                author=cls.users[i % cls.AUTHORS_COUNT],
+                group=cls.groups[i % cls.GROUPS_COUNT])
+                for i in range(cls.POSTS_COUNT)])
+        cls.post = Post.objects.first()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_queries_do_not_depend_on_page_size(self):
+        """Страницы лент загружаются фиксированным числом запросов"""
+        feeds = {
+            reverse('posts:index'): 2,
+            reverse('posts:group_list',
+                    kwargs={'slug': self.groups[0].slug}): 4,
+            reverse('posts:profile',
+                    kwargs={'username': self.users[0].username}): 4,
+            reverse('posts:post_detail',
+                    kwargs={'post_id': self.post.pk}): 2,
+        }
+        for page, queries in feeds.items():
+            for params in ({}, {'page': 2}):
+                with self.subTest(page=page, params=params):
+                    cache.clear()
+                    with self.assertNumQueries(queries):
+                        self.client.get(page, params)
+
+    def test_cursor_feed_queries(self):
+        """Страница по курсору загружается без подсчёта записей"""
+        cursor = encode_cursor(self.post)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('posts:index'), {'after': cursor})
+
+
+class FeedCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.feeds = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': cls.user.username}),
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.authorized = Client()
+        self.authorized.force_login(FeedCacheTest.user)
+
+    def test_feed_pages_are_cached(self):
+        """Повторный запрос ленты не выбирает посты из базы"""
+        for page, queries in zip(self.feeds, (1, 3, 3)):
+            with self.subTest(page=page):
+                self.client.get(page)
+                with self.assertNumQueries(queries):
+                    response = self.client.get(page)
+                self.assertContains(response, 'Тестовый пост')
+
+    def test_post_create_and_edit_invalidate_feeds(self):
+        """Создание и правка поста сбрасывают кэш лент"""
+        for page in self.feeds:
+            self.client.get(page)
+        self.authorized.post(
+            reverse('posts:post_create'),
+            {'text': 'Новый пост', 'group': self.group.pk})
+        self.authorized.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            {'text': 'Исправленный пост', 'group': self.group.pk})
+        for page in self.feeds:
+            with self.subTest(page=page):
+                response = self.client.get(page)
+                self.assertContains(response, 'Новый пост')
+                self.assertContains(response, 'Исправленный пост')
+
+    def test_group_change_invalidates_feeds(self):
+        """Изменение группы сбрасывает кэш страниц с её ссылками"""
+        self.client.get(self.feeds[0])
+        self.group.slug = 'new_slug'
+        self.group.save()
+        response = self.client.get(self.feeds[0])
+        self.assertContains(response, '/group/new_slug/')
+
+    @override_settings(REPLICA_DATABASES=['replica'])
+    def test_replica_reads_right_after_write_are_not_cached(self):
+        """Страница из реплики сразу после записи не кэшируется"""
+        Post.objects.create(
+            author=self.user, text='Новый пост', group=self.group)
+        page_obj = PostPaginator(Post.objects.all(), 10).page(1)
+        with use_replicas():
+            self.assertEqual(feed_cache(INDEX_FEED, page_obj).timeout, 0)
+        self.assertEqual(
+            feed_cache(INDEX_FEED, page_obj).timeout,
+            settings.FEED_CACHE_TIMEOUT)
+        with mock.patch('core.routers.random.choice',
+                        return_value='default'):
+            for page in self.feeds:
+                with self.subTest(page=page):
+                    response = self.client.get(page)
+                    self.assertFalse(response.has_header('ETag'))
+            later = time.time() + settings.REPLICA_PIN_SECONDS
+            with mock.patch('posts.caching.time.time', return_value=later):
+                with use_replicas():
+                    self.assertEqual(
+                        feed_cache(INDEX_FEED, page_obj).timeout,
+                        settings.FEED_CACHE_TIMEOUT)
+                response = self.client.get(self.feeds[0])
+                self.assertTrue(response.has_header('ETag'))
+
+    def test_author_rename_invalidates_feeds(self):
+        """Новое имя автора сразу видно во всех лентах с его постами"""
+        for page in self.feeds:
+            self.client.get(page)
+        self.user.first_name = 'Лев'
+        self.user.last_name = 'Толстой'
+        self.user.save()
+        for page in self.feeds:
+            with self.subTest(page=page):
+                self.assertContains(self.client.get(page), 'Лев Толстой')
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.pages = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': cls.user.username}),
+            reverse('posts:post_detail', kwargs={'post_id': cls.post.pk}),
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unchanged_pages_return_not_modified(self):
+        """Неизменившаяся страница отдаётся ответом 304"""
+        for page in self.pages:
+            with self.subTest(page=page):
+                response = self.client.get(page)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertTrue(response.has_header('Last-Modified'))
+                response = self.client.get(
+                    page, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_post_edit_changes_validators(self):
+        """Правка поста меняет ETag всех страниц с ним"""
+        etags = [self.client.get(page)['ETag'] for page in self.pages]
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный пост'
+        post.save()
+        for page, etag in zip(self.pages, etags):
+            with self.subTest(page=page):
+                response = self.client.get(page, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_author_rename_changes_validators(self):
+        """Смена имени автора меняет ETag страниц с его постами"""
+        etags = [self.client.get(page)['ETag'] for page in self.pages]
+        self.client.force_login(self.user)
+        self.client.logout()
+        for page, etag in zip(self.pages, etags):
+            with self.subTest(page=page, user='login'):
+                response = self.client.get(page, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.user.first_name = 'Лев'
+        self.user.save()
+        for page, etag in zip(self.pages, etags):
+            with self.subTest(page=page):
+                response = self.client.get(page, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_authorized_pages_are_not_conditional(self):
+        """Авторизованным страницы отдаются без валидаторов"""
+        self.client.force_login(self.user)
+        response = self.client.get(self.pages[0])
+        self.assertFalse(response.has_header('ETag'))
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.cats = Post.objects.create(
+            author=cls.user, text='Новые посты о котах')
+        cls.dogs = Post.objects.create(
+            author=cls.user, text='Пост о собаках')
+        cls.tree = Post.objects.create(
+            author=cls.user, text='Ёлка во дворе')
+
+    def search(self, query, **params):
+        return self.client.get(
+            reverse('posts:search'), {'q': query, **params}).context
+
+    def test_search_finds_word_forms(self):
+        """Поиск находит разные формы слова и игнорирует регистр и ё"""
+        self.assertEqual(
+            set(self.search('ПОСТАМИ')['posts']), {self.cats, self.dogs})
+        self.assertEqual(self.search('елка')['posts'], [self.tree])
+        self.assertEqual(self.search('кот')['posts'], [self.cats])
+        self.assertEqual(self.search('слон')['posts'], [])
+
+    def test_search_follows_post_edit(self):
+        """Изменённый текст поста сразу доступен поиску"""
+        self.tree.text = 'Сосна во дворе'
+        self.tree.save()
+        self.assertEqual(self.search('ёлка')['posts'], [])
+        self.assertEqual(self.search('сосна')['posts'], [self.tree])
+
+    def test_search_cursor_pages(self):
+        """Результаты поиска листаются по курсору без повторов"""
+        Post.objects.bulk_create(
+            [Post(author=self.user, text=f'Пост номер {i}')
+             for i in range(12)])
+        first = self.search('пост')
+        second = self.search('пост', after=first['next_cursor'])
+        self.assertEqual(len(first['posts']), 10)
+        self.assertEqual(len(second['posts']), 4)
+        self.assertIsNone(second['next_cursor'])
+        self.assertFalse(set(first['posts']) & set(second['posts']))
+
+    def test_admin_search_uses_text_index(self):
+        """Поиск в админке находит посты по формам слова"""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'котами'})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [self.cats])
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            [Post(text=f'Пост {i}', author=cls.user, group=cls.group)
+             for i in range(3)])
+        Post.objects.create(text='Пост без группы', author=cls.user)
+
+    def test_csv_export(self):
+        """Выгрузка CSV отдаёт все посты группы потоком"""
+        response = self.client.get(reverse(
+            'posts:group_export', kwargs={'slug': self.group.slug}))
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,text,pub_date,author,group')
+        self.assertEqual(len(lines), 4)
+
+    def test_json_export(self):
+        """Выгрузка JSON отдаёт все посты автора"""
+        response = self.client.get(reverse(
+            'posts:profile_export',
+            kwargs={'username': self.user.username}), {'format': 'json'})
+        posts = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(posts), 4)
+        self.assertEqual(posts[0]['text'], 'Пост без группы')
+        self.assertEqual(posts[0]['author'], 'author')
+
+    def test_header_is_sent_before_query(self):
+        """Заголовок выгрузки уходит до запроса постов"""
+        for export_format, header in (
+                ('csv', b'id,text,pub_date,author,group\r\n'),
+                ('json', b'[')):
+            with self.subTest(export_format=export_format):
+                response = self.client.get(reverse(
+                    'posts:group_export', kwargs={'slug': self.group.slug}),
+                    {'format': export_format})
+                chunks = iter(response.streaming_content)
+                with self.assertNumQueries(0):
+                    self.assertEqual(next(chunks), header)
+                self.assertTrue(b''.join(chunks))
+
+
+class SyndicationFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.feeds = [
+            reverse('posts:index_rss'),
+            reverse('posts:index_atom'),
+            reverse('posts:group_rss', kwargs={'slug': cls.group.slug}),
+            reverse('posts:group_atom', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile_rss',
+                    kwargs={'username': cls.user.username}),
+            reverse('posts:profile_atom',
+                    kwargs={'username': cls.user.username}),
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_contain_posts(self):
+        """Ленты RSS и Atom содержат пост со ссылкой на него"""
+        link = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        for feed in self.feeds:
+            with self.subTest(feed=feed):
+                response = self.client.get(feed)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertContains(response, self.post.text)
+                self.assertContains(response, link)
+                self.assertTrue(response.has_header('ETag'))
+
+    def test_unknown_feed_object_returns_404(self):
+        """Лента несуществующей группы отдаёт 404"""
+        response = self.client.get(
+            reverse('posts:group_rss', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_feeds_are_cached(self):
+        """Повторный опрос ленты не выбирает посты из базы"""
+        for feed, queries in zip(self.feeds, (0, 0, 1, 1, 1, 1)):
+            with self.subTest(feed=feed):
+                self.client.get(feed)
+                with self.assertNumQueries(queries):
+                    self.client.get(feed)
+
+    def test_feed_cache_key_fits_memcached(self):
+        """Ключ кэша ленты короткий и в ASCII при любом имени автора"""
+        author = User.objects.create_user(username='автор' * 30)
+        Post.objects.create(author=author, text='Пост автора')
+        feed = reverse('posts:profile_rss',
+                       kwargs={'username': author.username})
+        with mock.patch('posts.feeds.cache.set') as cache_set:
+            response = self.client.get(feed)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        key = cache_set.call_args[0][0]
+        self.assertTrue(key.isascii())
+        self.assertLessEqual(len(key), 250)
+
+    def test_feeds_follow_new_posts(self):
+        """Новый пост сбрасывает ETag и попадает в ленты"""
+        etags = [self.client.get(feed)['ETag'] for feed in self.feeds]
+        Post.objects.create(
+            author=self.user, text='Свежий пост', group=self.group)
+        for feed, etag in zip(self.feeds, etags):
+            with self.subTest(feed=feed):
+                response = self.client.get(feed, HTTP_IF_NONE_MATCH=etag)
+                self.assertContains(response, 'Свежий пост')
+                response = self.client.get(
+                    feed, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED)
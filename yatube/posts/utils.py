@@ -0,0 +1,213 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes, force_str
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .counters import TOTAL_POSTS_COUNT_KEY
+
+CURSOR_SEPARATOR = '|'
+
+
+def encode_position(pub_date, pk):
+    value = f'{pub_date.isoformat()}{CURSOR_SEPARATOR}{pk}'
+    return urlsafe_base64_encode(force_bytes(value))
+
+
+def encode_cursor(post):
+    """Кодирует позицию записи в ленте в непрозрачный курсор."""
+    return encode_position(post.pub_date, post.pk)
+
+
+def decode_cursor(cursor):
+    """Возвращает пару (pub_date, pk) или None для испорченного курсора."""
+    try:
+        value = force_str(urlsafe_base64_decode(cursor))
+        pub_date, pk = value.split(CURSOR_SEPARATOR)
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+def posts_after(posts, pub_date, pk):
+    """Записи ленты, идущие после позиции (pub_date, pk)."""
+    # Условие по одному pub_date позволяет SQLite начать обход индекса
+    # прямо с позиции курсора, а OR лишь отсекает записи с той же датой.
+    return posts.filter(
+        Q(pub_date__lt=pub_date) | Q(pk__lt=pk),
+        pub_date__lte=pub_date,
+    ).order_by('-pub_date', '-pk')
+
+
+def posts_before(posts, pub_date, pk):
+    """Записи ленты перед позицией (pub_date, pk), от ближайшей."""
+    return posts.filter(
+        Q(pub_date__gt=pub_date) | Q(pk__gt=pk),
+        pub_date__gte=pub_date,
+    ).order_by('pub_date', 'pk')
+
+
+class CursorLinksMixin:
+    """Курсоры соседних страниц: ссылки по ним открываются без OFFSET."""
+
+    @property
+    def next_cursor(self):
+        if self.has_next() and len(self):
+            return encode_cursor(self[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous() and len(self):
+            return encode_cursor(self[0])
+        return None
+
+
+class CursorPage(CursorLinksMixin, Page):
+    """Страница ленты, выбранная по курсору без OFFSET и COUNT(*).
+
+    Записи загружаются при первом обращении, поэтому страница, чей
+    HTML уже лежит в кэше, не обращается к базе.
+    """
+
+    is_cursor = True
+
+    def __init__(self, posts, paginator, cursor, forward):
+        self.number = None
+        self.paginator = paginator
+        self.cursor = cursor
+        self._posts = posts
+        self._forward = forward
+
+    def __repr__(self):
+        return '<Page by cursor>'
+
+    @cached_property
+    def _window(self):
+        per_page = self.paginator.per_page
+        posts = list(self._posts[:per_page + 1])
+        if not posts:
+            # Курсор за краем ленты: соседних страниц нет.
+            return posts, False, False
+        has_more = len(posts) > per_page
+        posts = posts[:per_page]
+        if self._forward:
+            return posts, has_more, True
+        posts.reverse()
+        return posts, True, has_more
+
+    @property
+    def object_list(self):
+        return self._window[0]
+
+    def has_next(self):
+        return self._window[1]
+
+    def has_previous(self):
+        return self._window[2]
+
+
+class PostPage(CursorLinksMixin, Page):
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(self.number)
+
+
+class PostPaginator(Paginator):
+    """Paginator ленты постов с поддержкой курсоров ?after= / ?before=.
+
+    Лента упорядочена по (-pub_date, -id), поэтому страница по курсору
+    выбирается одним запросом по индексу, сколько бы страниц ни было
+    до неё. Если число записей уже известно (например, из счётчика),
+    его можно передать в count, и COUNT(*) выполняться не будет.
+    """
+
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, *args, count=None, **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self._count = count
+
+    def _get_page(self, *args, **kwargs):
+        return PostPage(*args, **kwargs)
+
+    def get_elided_page_range(self, number=1, on_each_side=2, on_ends=1):
+        """Номера страниц вокруг number и по краям, разрывы — ELLIPSIS.
+
+        Длина списка не зависит от числа страниц, поэтому навигация
+        рисуется одинаково быстро и для 2, и для 10 000 страниц.
+        """
+        number = self.validate_number(number)
+        num_pages = self.num_pages
+        if num_pages <= (on_each_side + on_ends) * 2 + 1:
+            return list(self.page_range)
+        pages = []
+        if number > on_each_side + on_ends + 1:
+            pages += range(1, on_ends + 1)
+            pages.append(self.ELLIPSIS)
+            pages += range(number - on_each_side, number + 1)
+        else:
+            pages += range(1, number + 1)
+        if number < num_pages - on_each_side - on_ends:
+            pages += range(number + 1, number + on_each_side + 1)
+            pages.append(self.ELLIPSIS)
+            pages += range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            pages += range(number + 1, num_pages + 1)
+        return pages
+
+    @cached_property
+    def count(self):
+        if self._count is not None:
+            return self._count
+        return super().count
+
+    def cursor_page(self, after=None, before=None):
+        position = decode_cursor(after or before)
+        if position is None:
+            return self.get_page(1)
+        if after:
+            posts = posts_after(self.object_list, *position)
+            return CursorPage(posts, self, f'after:{after}', forward=True)
+        posts = posts_before(self.object_list, *position)
+        return CursorPage(posts, self, f'before:{before}', forward=False)
+
+
+class CachedCountPaginator(PostPaginator):
+    """Paginator, берущий число записей из кэша вместо COUNT(*).
+
+    Значение поддерживается сигналами постов (см. posts.counters) и
+    живёт POSTS_COUNT_CACHE_TIMEOUT секунд. Пока записей меньше
+    POSTS_EXACT_COUNT_LIMIT, число записей всегда считается точно.
+    """
+
+    cache_key = TOTAL_POSTS_COUNT_KEY
+
+    @cached_property
+    def count(self):
+        if self._count is not None:
+            return self._count
+        count = cache.get(self.cache_key)
+        if count is None or count < settings.POSTS_EXACT_COUNT_LIMIT:
+            count = super().count
+            cache.set(
+                self.cache_key, count, settings.POSTS_COUNT_CACHE_TIMEOUT)
+        return count
+
+
+def paginate(request, post_list, per_page, count=None,
+             paginator_class=PostPaginator):
+    """Возвращает страницу ленты по ?after=, ?before= или ?page=."""
+    paginator = paginator_class(post_list, per_page, count=count)
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if after or before:
+        return paginator.cursor_page(after=after, before=before)
+    return paginator.get_page(request.GET.get('page'))
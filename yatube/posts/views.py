@@ -1,72 +1,128 @@
-from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, render, redirect
 
-from users.forms import User
+from core.routers import primary_db
 
+from .caching import (INDEX_FEED, feed_cache, group_feed, group_validators,
+                      index_validators, post_validators, profile_feed,
+                      profile_validators)
+from .counters import (author_posts_count, author_posts_count_by_id,
+                       group_posts_count)
+from .decorators import conditional_page
+from .export import export_response
 from .forms import PostForm
-from .models import Group, Post
+from .lookups import authors, groups
+from .models import Post
+from .search import search_posts
+from .utils import CachedCountPaginator, paginate
 
 POSTS_ON_SCREEN = 10
 CHARACTERS_IN_HEADER = 30
 
 
+def index_posts():
+    return Post.objects.select_related('author', 'group')
+
+
+def group_post_list(group):
+    return group.posts.select_related('author')
+
+
+def author_post_list(author):
+    return author.posts.select_related('group')
+
+
+@conditional_page(index_validators)
 def index(request):
     template = 'posts/index.html'
-    post_list = Post.objects.all().order_by('-pub_date')
-    paginator = Paginator(post_list, POSTS_ON_SCREEN)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = index_posts()
+    page_obj = paginate(
+        request, post_list, POSTS_ON_SCREEN,
+        paginator_class=CachedCountPaginator)
     text = 'Последние обновления на сайте'
     context = {
         'title': text,
         'page_obj': page_obj,
+        'feed_cache': feed_cache(INDEX_FEED, page_obj),
     }
     return render(request, template, context)
 
 
+@conditional_page(group_validators)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, POSTS_ON_SCREEN)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    group = groups.get_or_404(slug)
+    post_list = group_post_list(group)
+    page_obj = paginate(
+        request, post_list, POSTS_ON_SCREEN, count=group_posts_count(group.pk))
     template = 'posts/group_list.html'
     text = f'Записи сообщества {group.title}'
     context = {
         'group': group,
         'page_obj': page_obj,
+        'feed_cache': feed_cache(group_feed(group.pk), page_obj),
         'title': text,
     }
     return render(request, template, context)
 
 
+@conditional_page(profile_validators)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('group')
-    paginator = Paginator(posts, POSTS_ON_SCREEN)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    author = authors.get_or_404(username)
+    posts = author_post_list(author)
+    posts_count = author_posts_count_by_id(author.pk)
+    page_obj = paginate(request, posts, POSTS_ON_SCREEN, count=posts_count)
     template = 'posts/profile.html'
     context = {
         'author': author,
-        'posts': posts,
+        'posts_count': posts_count,
         'page_obj': page_obj,
+        'feed_cache': feed_cache(profile_feed(author.pk), page_obj),
     }
     return render(request, template, context)
 
 
+def group_export(request, slug):
+    group = groups.get_or_404(slug)
+    return export_response(
+        group.posts.all(), request.GET.get('format'), f'group_{group.slug}')
+
+
+def profile_export(request, username):
+    author = authors.get_or_404(username)
+    return export_response(
+        author.posts.all(), request.GET.get('format'),
+        f'profile_{author.username}')
+
+
+@conditional_page(post_validators)
 def post_detail(request, post_id):
-    posts = get_object_or_404(Post, id=post_id)
+    posts = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), id=post_id)
     template = 'posts/post_detail.html'
     context = {
         'posts': posts,
+        'posts_count': author_posts_count(posts.author),
         'id': id,
         'title': f'{posts.text[:CHARACTERS_IN_HEADER]}'
     }
     return render(request, template, context)
 
 
+def search(request):
+    query = request.GET.get('q', '')
+    posts, next_cursor = search_posts(
+        query, POSTS_ON_SCREEN, request.GET.get('after'))
+    template = 'posts/search.html'
+    context = {
+        'title': f'Поиск: {query}' if query else 'Поиск',
+        'query': query,
+        'posts': posts,
+        'next_cursor': next_cursor,
+    }
+    return render(request, template, context)
+
+
+@primary_db
 @login_required
 def post_create(request):
     is_edit = False
@@ -82,6 +138,7 @@ def post_create(request):
     return render(request, template, context)
 
 
+@primary_db
 @login_required
 def post_edit(request, post_id):
     is_edit = True
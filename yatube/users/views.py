@@ -1,10 +1,14 @@
+from django.utils.decorators import method_decorator
 from django.views.generic import CreateView
 
 from django.urls import reverse_lazy
 
+from core.routers import primary_db
+
 from .forms import CreationForm
 
 
+@method_decorator(primary_db, name='dispatch')
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -49,7 +50,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.NPlusOneMiddleware',
+    'core.middleware.SlowQueryMiddleware',
+    'core.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,7 +68,7 @@ ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -78,6 +83,9 @@ TEMPLATES = [
     },
 ]
 
+# Шаблоны, которые компилируются при запуске (см. core.warmup).
+TEMPLATE_WARMUP = []
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
@@ -91,6 +99,65 @@ DATABASES = {
     }
 }
 
+# PRAGMA, выполняемые на каждом новом соединении с SQLite (см. core.db).
+# В разработке остаются настройки SQLite по умолчанию, боевой профиль
+# задан в yatube/settings_production.py.
+SQLITE_PRAGMAS = {}
+
+# Чтения распределяются по алиасам REPLICA_DATABASES, записи идут в
+# default (см. core.routers). После записи пользователь читает из
+# основной базы ещё REPLICA_PIN_SECONDS секунд. Локальный стенд с
+# репликами: yatube/settings_replicas.py.
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+REPLICA_DATABASES = []
+REPLICA_PIN_COOKIE = 'pin_primary'
+REPLICA_PIN_SECONDS = 10
+
+# Запросы дольше SLOW_QUERY_MS миллисекунд вместе с планом попадают в
+# журнал медленных запросов в админке (см. core.slow_queries).
+# None выключает журнал.
+SLOW_QUERY_MS = 100
+
+# Поиск N+1 (см. core.nplusone): 'raise' роняет запрос или тест,
+# 'log' пишет предупреждение, None выключает проверку. Срабатывает на
+# NPLUSONE_THRESHOLD одинаковых запросах из ленивых связей.
+NPLUSONE_DETECTION = 'raise'
+NPLUSONE_THRESHOLD = 2
+TEST_RUNNER = 'core.nplusone.NPlusOneTestRunner'
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+# LocMemCache виден только своему процессу, поэтому подходит лишь для
+# разработки в один процесс: версии лент (posts.caching) и общее число
+# постов должны быть общими для всех воркеров. Боевой профиль берёт
+# memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yatube',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+# Время жизни закэшированных страниц лент, секунды.
+FEED_CACHE_TIMEOUT = 60 * 10
+
+
+# Каталог файлов с метриками воркеров (см. core.metrics). Общий для
+# всех процессов одного развёртывания, очищается при деплое.
+METRICS_DIR = os.environ.get(
+    'METRICS_DIR', os.path.join(tempfile.gettempdir(), 'yatube_metrics'))
+
+# Кэш групп и авторов в памяти процесса (см. posts.lookups): размер
+# каждого кэша и время жизни записи в секундах. В разработке и тестах
+# кэш выключен, чтобы объекты не переживали откат транзакции.
+LOOKUP_CACHE_SIZE = 1024
+LOOKUP_CACHE_TTL = 0
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -137,5 +204,11 @@ LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:/auth/logout/'
 
+# Число постов на главной берётся из кэша и может отставать
+# на POSTS_COUNT_CACHE_TIMEOUT секунд; до POSTS_EXACT_COUNT_LIMIT
+# записей выполняется точный COUNT(*).
+POSTS_COUNT_CACHE_TIMEOUT = 60
+POSTS_EXACT_COUNT_LIMIT = 10000
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
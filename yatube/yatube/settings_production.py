@@ -0,0 +1,86 @@
+"""Боевой профиль: DJANGO_SETTINGS_MODULE=yatube.settings_production.
+
+Отличается от yatube.settings настройками базы и шаблонов. SQLite
+переводится в режим WAL, в котором читатели не ждут пишущего и
+наоборот, а соединение живёт CONN_MAX_AGE секунд и переиспользуется
+воркером между запросами вместо переподключения на каждый запрос.
+Шаблоны разбираются один раз: их держит в памяти кэширующий
+загрузчик, а основные компилируются ещё при запуске.
+
+Кэш общий для всех воркеров — memcached по адресам из
+MEMCACHED_LOCATION через запятую. В нём лежат версии лент и общее
+число постов: в кэше в памяти процесса запись сбросила бы ленты только
+в обработавшем её воркере, а остальные отдавали бы старые страницы.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            # Сколько секунд ждать блокировку, прежде чем вернуть
+            # «database is locked».
+            'timeout': 20,
+        },
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ.get(
+            'MEMCACHED_LOCATION', '127.0.0.1:11211').split(','),
+        'KEY_PREFIX': 'yatube',
+    },
+}
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    # В режиме WAL NORMAL не теряет целостность при сбое, а fsync
+    # выполняется только на контрольных точках.
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение задаёт размер кэша страниц в КиБ.
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'debug': False,
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+TEMPLATE_WARMUP = [
+    'base.html',
+    'includes/header.html',
+    'includes/footer.html',
+    'posts/index.html',
+    'posts/group_list.html',
+    'posts/profile.html',
+    'posts/post_detail.html',
+    'posts/includes/paginator.html',
+    'posts/includes/cursor_paginator.html',
+]
+
+LOOKUP_CACHE_TTL = 300
+
+NPLUSONE_DETECTION = None
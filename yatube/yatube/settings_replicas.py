@@ -0,0 +1,30 @@
+"""Стенд с репликами: DJANGO_SETTINGS_MODULE=yatube.settings_replicas.
+
+Репликами служат копии db.sqlite3 в файлах db.replica1.sqlite3 и
+db.replica2.sqlite3. Их обновляет команда
+
+    python manage.py sync_replicas --every 5
+
+а пока она не отработала, реплики отстают от основной базы так же,
+как отставали бы настоящие. Тесты запускаются с
+yatube.settings_test, где реплик нет: маршрутизацию по репликам тесты
+включают сами через override_settings(REPLICA_DATABASES=...).
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES
+
+REPLICA_DATABASES = ['replica1', 'replica2']
+
+DATABASES = {
+    'default': DATABASES['default'],
+    **{
+        alias: {
+            **DATABASES['default'],
+            'NAME': os.path.join(BASE_DIR, f'db.{alias}.sqlite3'),
+            'TEST': {'MIRROR': 'default'},
+        }
+        for alias in REPLICA_DATABASES
+    },
+}
@@ -0,0 +1,30 @@
+"""Настройки для тестов: python manage.py test и pytest.
+
+База в памяти, быстрый хэшер паролей и отдельный каталог метрик.
+manage.py test выбирает этот модуль сам, pytest — через pytest.ini.
+Параллельный запуск: python manage.py test --parallel или, с
+pytest-xdist, pytest -n auto; каждый процесс получает свою базу в
+памяти.
+"""
+import atexit
+import shutil
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+# PBKDF2 нарочно медленный; в тестах каждый create_user стоит десятки
+# миллисекунд.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+METRICS_DIR = tempfile.mkdtemp(prefix='yatube_test_metrics_')
+atexit.register(shutil.rmtree, METRICS_DIR, ignore_errors=True)
+
+# Журнал медленных запросов тесты включают сами (core.tests).
+SLOW_QUERY_MS = None